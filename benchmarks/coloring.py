@@ -0,0 +1,174 @@
+"""
+Benchmark of edge coloring algorithms on random bipartite graphs generated by
+`bipartite.generating.bgraph`. Run it as 
+
+    python -m benchmarks.coloring
+
+or as follows to calibrate costs of the algorithms for `colorize` in "auto" 
+mode, see `bipartite.coloring.AUTO_COSTS`:
+
+    python -m benchmarks.coloring --calibrate
+
+https://github.com/severmore/pygraphs
+"""
+import math
+import random
+import statistics
+import sys
+import time
+
+import bipartite.coloring
+import bipartite.generating
+import bipartite.graph
+
+ALGORITHMS = ('Vising', 'Cole-Hopcroft', 'Alon')
+
+SIZES = (40, 80, 160)
+EDGE_PROBS = (0.05, 0.2, 0.5)
+
+
+def measure(graph, algorithm, repeat=3):
+  """ Returns the best time in seconds of `repeat` colorings of a graph. """
+  best = float('inf')
+
+  for _ in range(repeat):
+    start = time.perf_counter()
+    bipartite.coloring.colorize(graph, algorithm=algorithm)
+    best = min(best, time.perf_counter() - start)
+  
+  return best
+
+
+def run(sizes=SIZES, edge_probs=EDGE_PROBS, algorithms=ALGORITHMS, seed=0,
+        repeat=3):
+  """ 
+  Colors a random bipartite graph for each pair of size and edge probability
+  by each algorithm. Returns a list of dicts with graph parameters and times of
+  the algorithms.
+  """
+  random.seed(seed)
+  results = list()
+
+  for size in sizes:
+    for edge_prob in edge_probs:
+
+      graph = bipartite.generating.bgraph(size, vratio_low=.5, vratio_high=.5,
+                                          edge_prob=edge_prob)
+      result = {
+          'vertices': graph.vertices_num,
+          'edges': sum(map(len, graph.edges)) // 2,
+          'max_degree': graph.max_degree,
+      }
+
+      for algorithm in algorithms:
+        result[algorithm] = measure(graph, algorithm, repeat)
+
+      results.append(result)
+
+  return results
+
+
+# Random near-regular graphs of calibration: the numbers of vertices of a 
+# part, degrees and shares of edges dropped. Vising's algorithm is the slowest
+# on them, and the algorithms based on Euler splits are the fastest when the
+# degree is a power of two.
+REGULAR_SIZES = (200, 1000, 3000)
+REGULAR_DEGREES = (3, 4, 8, 16)
+REGULAR_DROPS = (0., .05, .2)
+
+
+def regular(size, degree, drop=0., seed=None):
+  """ 
+  Returns a random bipartite multigraph with parts of `size` vertices as a 
+  union of `degree` random perfect matchings with a `drop` share of edges
+  removed at random. The edges are shuffled. 
+  """
+  rng = random.Random(seed)
+  edges = list()
+
+  for _ in range(degree):
+    ends = list(range(size, 2 * size))
+    rng.shuffle(ends)
+    edges.extend((start, end) for start, end in enumerate(ends) 
+                              if rng.random() >= drop)
+  
+  rng.shuffle(edges)
+  return bipartite.graph.UDGraph(edges=edges, vertices_num=2 * size)
+
+
+def calibrate(sizes=SIZES, edge_probs=EDGE_PROBS, algorithms=ALGORITHMS, 
+              seed=0, repeat=3):
+  """
+  Calibrates `bipartite.coloring.estimate_times` on random bipartite graphs 
+  and random near-regular ones. The units of alternating paths of Vising's 
+  algorithm are fitted by least squares of its time per edge against the 
+  conflict rate times log2(V), and the costs of the algorithms are the 
+  medians of seconds per work unit.
+
+  Returns:
+    :obj:`dict` of :obj:`str` - float, float: costs of the algorithms and 
+        `VISING_PATH_UNITS`.
+  """
+  random.seed(seed)
+  graphs = [ bipartite.generating.bgraph(size, vratio_low=.5, vratio_high=.5,
+                                         edge_prob=edge_prob)
+               for size in sizes for edge_prob in edge_probs ]
+  graphs += [ regular(size, degree, drop, seed)
+                for size in REGULAR_SIZES for degree in REGULAR_DEGREES
+                for drop in REGULAR_DROPS ]
+
+  measures = list()
+
+  for graph in graphs:
+    degrees = [ graph.degree(v) for v in graph.get_vertices() ]
+    edges_num = sum(degrees) // 2
+
+    if not edges_num:
+      continue
+
+    paths = bipartite.coloring._conflict_rate(graph, degrees, 
+                                              graph.max_degree) * \
+            math.log2(graph.vertices_num)
+    times = { algorithm: measure(graph, algorithm, repeat) 
+              for algorithm in algorithms }
+    measures.append((graph, edges_num, paths, times))
+  
+  # Vising's time per edge is cost * (1 + path_units * paths)
+  xs = [ paths for _, _, paths, _ in measures ]
+  ys = [ times['Vising'] / edges_num for _, edges_num, _, times in measures ]
+  mean_x, mean_y = statistics.mean(xs), statistics.mean(ys)
+  slope = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / \
+          sum((x - mean_x) ** 2 for x in xs)
+  path_units = slope / (mean_y - slope * mean_x)
+
+  units = { algorithm: 1. for algorithm in algorithms }
+  samples = { algorithm: list() for algorithm in algorithms }
+
+  for graph, edges_num, paths, times in measures:
+    work = bipartite.coloring.estimate_times(graph, units)
+    work['Vising'] = edges_num * (1 + path_units * paths)
+
+    for algorithm in algorithms:
+      samples[algorithm].append(times[algorithm] / work[algorithm])
+
+  return { algorithm: statistics.median(samples[algorithm]) 
+           for algorithm in algorithms }, path_units
+
+
+if __name__ == '__main__':
+
+  if '--calibrate' in sys.argv:
+    costs, path_units = calibrate()
+
+    for name, cost in costs.items():
+      print(f'{name!r}: {cost:.3g},')
+    print(f'VISING_PATH_UNITS = {path_units:.2g}')
+    sys.exit()
+
+  print(f'{"V":>6} {"E":>7} {"D":>5}', 
+        ' '.join(f'{name:>14}' for name in ALGORITHMS))
+
+  for result in run():
+    times = ' '.join(f'{result[name]:14.4f}' for name in ALGORITHMS)
+    print(f'{result["vertices"]:6} {result["edges"]:7} '
+          f'{result["max_degree"]:5} {times}')
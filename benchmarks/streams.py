@@ -0,0 +1,94 @@
+"""
+Benchmark of streaming edge list readers and writers of `bipartite.streams`
+on a random bipartite graph generated by `bipartite.generating.bgraph`. The
+throughput is reported in MB/s of the file written or read. Run it as
+
+    python -m benchmarks.streams [edges number]
+
+https://github.com/severmore/pygraphs
+"""
+import math
+import os
+import sys
+import tempfile
+import time
+
+import bipartite.generating
+import bipartite.graph
+import bipartite.streams
+
+# The file names of formats, ".gz" files are compressed.
+FORMATS = {
+  'text': 'edges.txt',
+  'gzip': 'edges.txt.gz',
+  'binary': 'edges.bin',
+}
+
+
+def run(edges_num=10 ** 6, seed=0):
+  """
+  Writes and reads back the edges of a random bipartite graph of about
+  `edges_num` edges in each format. Returns a list of dicts with the format,
+  the file size in MB and the write and read throughput in MB/s.
+
+  Raises:
+    RuntimeError: if a graph read back differs from the graph written in the
+        number of edges or the maximum degree.
+  """
+  vertices_num = int(math.sqrt(edges_num)) * 4
+  edge_prob = 4 * edges_num / vertices_num ** 2
+  graph = bipartite.generating.bgraph(vertices_num, vratio_low=.5,
+                                      vratio_high=.5, edge_prob=edge_prob,
+                                      seed=seed)
+
+  # `bgraph` stores both halves of each edge in a directed graph, so it is
+  # written once per edge as an undirected graph, which is read back
+  graph = bipartite.graph.UDGraph(
+      edges=( (start, end) for start, incidence in enumerate(graph.edges)
+                           for end in incidence if start < end ),
+      vertices_num=graph.vertices_num)
+  positions_num = sum(len(incidence) for incidence in graph.edges)
+  results = list()
+
+  with tempfile.TemporaryDirectory() as directory:
+    for name, file_name in FORMATS.items():
+      path = os.path.join(directory, file_name)
+      binary = name == 'binary'
+
+      start = time.perf_counter()
+      bipartite.streams.write_edges(graph, path, binary=binary)
+      write_time = time.perf_counter() - start
+
+      start = time.perf_counter()
+      read = bipartite.streams.read_graph(path, 
+                                          vertices_num=graph.vertices_num,
+                                          binary=binary)
+      read_time = time.perf_counter() - start
+
+      read_positions = sum(len(incidence) for incidence in read.edges)
+      if read_positions != positions_num or \
+         read.max_degree != graph.max_degree:
+        raise RuntimeError(
+            f'{name}: read {read_positions} edge positions of max degree '
+            f'{read.max_degree}, written {positions_num} of max degree '
+            f'{graph.max_degree}')
+
+      size = os.path.getsize(path) / 2 ** 20
+      results.append({
+          'format': name,
+          'size': size,
+          'write': size / write_time,
+          'read': size / read_time,
+      })
+
+  return results
+
+
+if __name__ == '__main__':
+  edges_num = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 6
+
+  print(f'{"format":>8} {"MB":>8} {"write MB/s":>11} {"read MB/s":>11}')
+
+  for result in run(edges_num):
+    print(f'{result["format"]:>8} {result["size"]:8.2f} '
+          f'{result["write"]:11.2f} {result["read"]:11.2f}')
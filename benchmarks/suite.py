@@ -0,0 +1,252 @@
+"""
+Benchmark suite of the algorithms of the `bipartite` package. Each case is run
+over a sweep of sizes with fixed seeds, the best time of several runs and the
+peak memory allocated by one more run traced by `tracemalloc` are recorded.
+Run it as
+
+    python -m benchmarks.suite [--quick] [--output results.json]
+
+to save results as JSON, and as follows to compare them with stored ones and
+to exit with status 1 if any case is slower or takes more memory by more than
+a threshold:
+
+    python -m benchmarks.suite --baseline baseline.json [--threshold 0.25]
+
+https://github.com/severmore/pygraphs
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import bipartite.coloring
+import bipartite.generating
+import bipartite.graph
+import bipartite.matching
+import bipartite.spanning
+
+SEED = 0
+
+# A regression is a growth of time or peak memory by more than this share.
+THRESHOLD = 0.25
+
+# Time differences less than this number of seconds are taken as noise.
+TIME_RESOLUTION = 1e-3
+
+
+def _edges(vertices_num, seed):
+  graph = bipartite.generating.bgraph(vertices_num, vratio_low=.5,
+                                      vratio_high=.5, edge_prob=.1, seed=seed)
+  return [ (start, end) for start, incidence in enumerate(graph.edges)
+                        for end in incidence if start < end ]
+
+
+def _udgraph(vertices_num, seed):
+  return bipartite.graph.UDGraph(edges=_edges(vertices_num, seed))
+
+
+def _coloring_case(algorithm):
+  return (lambda size, seed: (_udgraph(size, seed),),
+          lambda graph: bipartite.coloring.colorize(graph, algorithm))
+
+
+def _spanning_case(max_distance):
+  def setup(size, seed):
+    graph = bipartite.generating.grid(size)
+    return graph, tuple(0 for _ in graph.get_vertices())
+
+  def run(graph, coloring):
+    bipartite.spanning.SpanningBGraph(graph)(coloring, max_distance)
+
+  return setup, run
+
+
+def _geo(size, seed):
+  generator = bipartite.generating.Geo(1., 3., (size, size), (4 * size,
+                                       4 * size), seed=seed)
+  return generator(size * size // 8)
+
+
+# A case is a name, a function making arguments of a run of a given size and a
+# seed, a function to measure, and sizes of a full and a quick sweep.
+CASES = [
+  ('graph', lambda size, seed: (_edges(size, seed),),
+   lambda edges: bipartite.graph.UDGraph(edges=edges),
+   (500, 1000, 2000), (100, 200)),
+
+  ('euler_partition', lambda size, seed: (_udgraph(size, seed),),
+   bipartite.matching.euler_partition,
+   (500, 1000, 2000), (100, 200)),
+
+  ('euler_split', lambda size, seed: (_udgraph(size, seed),),
+   bipartite.matching.euler_split,
+   (500, 1000, 2000), (100, 200)),
+
+  ('covering_matching', lambda size, seed: (_udgraph(size, seed),),
+   bipartite.matching.covering_matching,
+   (500, 1000, 2000), (100, 200)),
+
+  ('colorize.Vising', *_coloring_case('Vising'),
+   (200, 400, 800), (50, 100)),
+
+  ('colorize.Cole-Hopcroft', *_coloring_case('Cole-Hopcroft'),
+   (200, 400, 800), (50, 100)),
+
+  ('colorize.Alon', *_coloring_case('Alon'),
+   (200, 400, 800), (50, 100)),
+
+  ('spanning.distance-1', *_spanning_case(1), (4, 6, 8), (3, 4)),
+  ('spanning.distance-2', *_spanning_case(2), (4, 6, 8), (3, 4)),
+  ('spanning.distance-3', *_spanning_case(3), (4, 5, 6), (3,)),
+
+  ('generating.bgraph', lambda size, seed: (size, .5, .5, .1, seed),
+   bipartite.generating.bgraph,
+   (400, 800, 1600), (200, 400)),
+
+  ('generating.grid', lambda size, seed: (size,),
+   bipartite.generating.grid,
+   (50, 100, 200), (25, 50)),
+
+  ('generating.Geo', lambda size, seed: (size, seed), _geo,
+   (50, 100, 200), (25, 50)),
+]
+
+
+def measure(setup, func, size, seed=SEED, repeat=3):
+  """
+  Returns the best time in seconds of `repeat` runs of `func` and the peak
+  memory in bytes allocated by one more run. The arguments of each run are
+  made anew by `setup` from the same seed, as some algorithms destroy their
+  graphs, and they are not measured.
+  """
+  best = float('inf')
+
+  for _ in range(repeat):
+    random.seed(seed)
+    args = setup(size, seed)
+
+    start = time.perf_counter()
+    func(*args)
+    best = min(best, time.perf_counter() - start)
+
+  random.seed(seed)
+  args = setup(size, seed)
+
+  tracemalloc.start()
+  try:
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+  finally:
+    tracemalloc.stop()
+
+  return best, peak
+
+
+def run(quick=False, seed=SEED, repeat=3, names=None):
+  """
+  Runs the cases which names start with any of `names`, or all of them, over
+  their sweeps of sizes. Returns a dict of the environment and the list of
+  results, each is a dict of a case name, a size, a time and a peak memory.
+  """
+  results = list()
+
+  for name, setup, func, sizes, quick_sizes in CASES:
+
+    if names and not name.startswith(tuple(names)):
+      continue
+
+    for size in (quick_sizes if quick else sizes):
+      elapsed, peak = measure(setup, func, size, seed, repeat)
+      results.append({ 'name': name, 'size': size, 'time': elapsed,
+                       'peak_memory': peak })
+
+  return {
+    'python': platform.python_version(),
+    'platform': platform.platform(),
+    'seed': seed,
+    'results': results,
+  }
+
+
+def compare(report, baseline, threshold=THRESHOLD):
+  """
+  Compares results of `run` with baseline ones of the same cases and sizes.
+  Returns a list of regressions as dicts of a case name, a size, a metric -
+  "time" or "peak_memory", its baseline and current values and their ratio.
+  Cases and sizes missing in the baseline are skipped.
+  """
+  stored = { (result['name'], result['size']): result
+               for result in baseline['results'] }
+  regressions = list()
+
+  for result in report['results']:
+    before = stored.get((result['name'], result['size']))
+
+    if before is None:
+      continue
+
+    for metric, resolution in (('time', TIME_RESOLUTION), 
+                               ('peak_memory', 0)):
+      if before[metric] and \
+         result[metric] > before[metric] * (1 + threshold) and \
+         result[metric] - before[metric] > resolution:
+        regressions.append({
+          'name': result['name'],
+          'size': result['size'],
+          'metric': metric,
+          'baseline': before[metric],
+          'current': result[metric],
+          'ratio': result[metric] / before[metric],
+        })
+
+  return regressions
+
+
+def main(argv=None):
+  """
+  Runs the suite with command line arguments `argv`, default to `sys.argv`,
+  prints the results and saves or compares them as asked. Returns the exit
+  status: 1 if there are regressions against the baseline, otherwise 0.
+  """
+  parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+  parser.add_argument('names', nargs='*',
+                      help='prefixes of names of the cases to run')
+  parser.add_argument('--quick', action='store_true',
+                      help='run smaller sweeps of sizes')
+  parser.add_argument('--repeat', type=int, default=3)
+  parser.add_argument('--seed', type=int, default=SEED)
+  parser.add_argument('--output', help='a file to save results as JSON')
+  parser.add_argument('--baseline', help='a JSON file of results to compare')
+  parser.add_argument('--threshold', type=float, default=THRESHOLD)
+  args = parser.parse_args(argv)
+
+  report = run(args.quick, args.seed, args.repeat, args.names)
+
+  print(f'{"case":>24} {"size":>6} {"time, s":>10} {"peak, KB":>10}')
+  for result in report['results']:
+    print(f'{result["name"]:>24} {result["size"]:6} {result["time"]:10.4f} '
+          f'{result["peak_memory"] / 1024:10.1f}')
+
+  if args.output:
+    with open(args.output, 'w') as file:
+      json.dump(report, file, indent=2)
+
+  if args.baseline:
+    with open(args.baseline) as file:
+      regressions = compare(report, json.load(file), args.threshold)
+
+    for regression in regressions:
+      print(f'REGRESSION {regression["name"]}[{regression["size"]}] '
+            f'{regression["metric"]}: {regression["baseline"]:.4g} -> '
+            f'{regression["current"]:.4g} (x{regression["ratio"]:.2f})')
+
+    return 1 if regressions else 0
+
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
@@ -4,8 +4,29 @@ algorithm implementation.
 
 https://github.com/severmore/pygraphs
 """
+import concurrent.futures
+import math
+from array import array
+from collections.abc import Mapping
 
-def colorize(graph, algorithm='Vising'):
+import bipartite.graph
+import bipartite.tools
+
+# Seconds per work unit of each algorithm used by `colorize` in "auto" mode, 
+# see `estimate_times`. Calibrated by `python -m benchmarks.coloring 
+# --calibrate`.
+AUTO_COSTS = {
+  'Vising': 3.51e-06,
+  'Cole-Hopcroft': 2e-06,
+  'Alon': 2.21e-06,
+}
+
+# Edge units of Vising's alternating paths per an edge of conflict rate 1 per
+# log2 of the number of vertices, see `estimate_times`.
+VISING_PATH_UNITS = 0.12
+
+
+def colorize(graph, algorithm='Vising', costs=None, workers=None):
   """
   Perform minimal edge coloring on a bipartite graph.
 
@@ -16,12 +37,20 @@ def colorize(graph, algorithm='Vising'):
         up to user.
     
     algorithm(:obj:`str`, optinal): the algorithm to use for edge coloring. The
-        possible values are as follows: "Vising", "Cole-Hopcroft".
+        possible values are as follows: "Vising", "Cole-Hopcroft", "Alon" and
+        "auto". In "auto" mode the algorithm is chosen by `choose_algorithm`.
+
+    costs(:obj:`dict` of :obj:`str` - float, optional): seconds per work unit
+        of algorithms overriding `AUTO_COSTS` in "auto" mode. Default to None.
+
+    workers(int, optional): if it is given, connected components of a graph 
+        are colored independently, see `colorize_components`, by a pool of 
+        `workers` processes if there are more than one. Default to None.
   
   Return:
 
-    :obj:`dict` of (:obj:`turple` of int - int): - the resulting coloring of
-        edges of a given graph.
+    :obj:`EdgeColoring`: - the resulting coloring of edges of a given graph. It
+        is a mapping (:obj:`turple` of int - int) as a dict.
   
   References:
 
@@ -32,31 +61,335 @@ def colorize(graph, algorithm='Vising'):
     [2] Richard Cole, and John Hopcroft. On Edge Coloring Bipartite Graphs //
     SIAM Journal on Computing, Vol. 11, No. 3, pp. 540-546, 1982.
 
+    [3] Noga Alon. A Simple Algorithm for Edge-Coloring Bipartite 
+    Multigraphs // Information Processing Letters, Vol. 85, No. 6, 
+    pp. 301-302, 2003.
+
   """
+  if workers is not None:
+    return colorize_components(graph, algorithm, costs, workers)
+
+  if algorithm == 'auto':
+    algorithm = choose_algorithm(graph, costs)
+
   if algorithm == 'Vising':
     return VisingColoring(graph)()
   
   elif algorithm == 'Cole-Hopcroft':
     return ColeHopcroftColoring(graph)()
+
+  elif algorithm == 'Alon':
+    return AlonColoring(graph)()
   
   return None
 
 
-class VisingColoring:
+def colorize_components(graph, algorithm='Vising', costs=None, workers=1):
+  """
+  Colors each connected component of a graph with edges independently and
+  merges the colorings into one coloring of the graph. The components are
+  obtained by `bipartite.tools.split_components`, so the colors of each of 
+  them are copied to the positions of the graph by vertex maps. As the maximum
+  degree of a component does not exceed the one of the graph, the coloring is
+  still minimal. In "auto" mode the algorithm is chosen for each component.
+
+  Args:
+    graph(:obj:`Graph`) - a bipartite graph to color.
+
+    algorithm(:obj:`str`, optional) - the algorithm, see `colorize`. Default 
+        to "Vising".
+
+    costs(:obj:`dict` of :obj:`str` - float, optional): see `colorize`.
+
+    workers(int, optional): the number of processes coloring the components, 
+        components are colored in the current process if it is 1. Default to
+        1.
+
+  Returns:
+    :obj:`EdgeColoring`: the coloring of the graph or None if a component is 
+        failed to color, e.g. for an unknown algorithm.
+  """
+  if not isinstance(graph, bipartite.graph.CSRGraph):
+    graph = bipartite.graph.CSRGraph(graph=graph)
+
+  parts = [ (component, vertices) for component, vertices 
+              in bipartite.tools.split_components(graph)
+              if component.indices ]
+
+  # The largest components are sent first to balance the workers
+  parts.sort(key=lambda part: len(part[0].indices), reverse=True)
+  tasks = [ (component, algorithm, costs) for component, _ in parts ]
+
+  if workers > 1 and len(tasks) > 1:
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+      results = list(pool.map(_color_component, tasks))
+  else:
+    results = [ _color_component(task) for task in tasks ]
+
+  colors = _color_array(graph.max_degree, len(graph.indices))
+
+  for (component, vertices), component_colors in zip(parts, results):
+
+    if component_colors is None:
+      return None
+
+    if component_colors.typecode != colors.typecode:
+      component_colors = array(colors.typecode, component_colors)
+
+    for local, vertex in enumerate(vertices):
+      start, end = component.indptr[local], component.indptr[local + 1]
+      position = graph.indptr[vertex]
+      colors[position:position + end - start] = component_colors[start:end]
+
+  return EdgeColoring(graph, colors)
+
+
+def _color_component(task):
+  component, algorithm, costs = task
+  coloring = colorize(component, algorithm, costs)
+  return None if coloring is None else coloring.colors
+
+
+def choose_algorithm(graph, costs=None):
+  """ Returns the name of the algorithm with the least estimated time of 
+  coloring of a graph, see `estimate_times`. """
+  times = estimate_times(graph, costs)
+  return min(times, key=times.get)
+
+
+def estimate_times(graph, costs=None):
+  """
+  Estimates the time of coloring of a graph by each algorithm as a product of
+  its cost - seconds per work unit, and the number of work units:
+
+    - "Vising" colors an edge in O(1) unless both its ends miss no common 
+      color, then it swaps an alternating path. Such conflicts are frequent 
+      only if both ends are loaded, i.e. their degrees are close to the 
+      maximum degree, and a path is O(log V) long on average for random 
+      graphs. So the units are E * (1 + `VISING_PATH_UNITS` * C * log2(V)),
+      where C is the conflict rate estimated by `_conflict_rate`;
+
+    - "Cole-Hopcroft" makes an Euler split of all edges for each halving of 
+      the maximum degree and `t` halvings of all edges to find a matching for
+      each odd degree, where `2 ** t` is about the maximum degree times the 
+      number of maximum degree vertices, see `EulerSplitter.cover`;
+
+    - "Alon" does the same on a regular graph of about 2 * E / D vertices of 
+      the maximum degree D.
+
+  Both algorithms based on Euler splits take an extra unit per edge to set up
+  their scratch arrays. So the estimates depend on the number of vertices and
+  edges, the degree distribution relative to the maximum degree, the binary 
+  form of the maximum degree and the number of vertices of this degree.
+
+  Args:
+    graph(:obj:`Graph`) - a graph to color.
+
+    costs(:obj:`dict` of :obj:`str` - float, optional): seconds per work unit
+        of algorithms overriding `AUTO_COSTS`. Default to None.
+
+  Returns:
+    :obj:`dict` of :obj:`str` - float: estimated times in seconds.
+  """
+  costs = dict(AUTO_COSTS, **(costs or {}))
+
+  degree = graph.max_degree
+  degrees = [ graph.degree(v) for v in graph.get_vertices() ]
+  edges_num = sum(degrees) // 2
+  covered_num = degrees.count(degree)
+
+  paths = VISING_PATH_UNITS * _conflict_rate(graph, degrees, degree) * \
+          math.log2(max(graph.vertices_num, 2))
+
+  units = {
+    'Vising': edges_num * (1 + paths),
+    'Cole-Hopcroft': edges_num * (1 + _split_units(degree, covered_num)),
+    'Alon': edges_num * (1 + _split_units(degree, 
+                                          2 * edges_num // max(degree, 1))),
+  }
+
+  return { name: costs[name] * units[name] for name in units }
+
+
+def _conflict_rate(graph, degrees, max_degree, samples=256):
+  """
+  Estimates the rate of edges which ends miss no common color when they are 
+  colored by Vising's algorithm as the mean over edges (u, v) of 
+  `(load(u) * load(v)) ** 16`, where `load(v)` is the degree of `v` divided by
+  the maximum degree. The power is fitted on random bipartite graphs. The mean
+  is taken over the edges of every k-th vertex, so that at most `samples` 
+  vertices are visited.
+  """
+  if not max_degree:
+    return 0.
+
+  loads = [ (degree / max_degree) ** 16 for degree in degrees ]
+  total = edges_num = 0
+
+  for vertex in range(0, len(degrees), max(1, len(degrees) // samples)):
+    if loads[vertex]:
+      total += loads[vertex] * sum(loads[end] for end in graph.edges[vertex])
+    edges_num += degrees[vertex]
+
+  return total / edges_num if edges_num else 0.
+
+
+def _split_units(degree, covered_num):
+  """ Returns the number of work units per edge of coloring by Euler splits of
+  a graph of the maximum `degree` with `covered_num` vertices of this degree.
+  """
+  units, share = 0.0, 1.0
+
+  while degree > 1:
+
+    if degree % 2:
+      units += share * math.log2(degree * covered_num + 1)
+      share *= (degree - 1) / degree
+      degree -= 1
+    
+    else:
+      units += share
+      degree //= 2
+
+  return units
+
+
+def _color_array(colors_num, size):
+  """ Returns an array of `size` uncolored edges with the least type code able
+  to keep `colors_num` colors. """
+  typecode = 'h' if colors_num < 2 ** 15 else 'i'
+  return array(typecode, [EdgeColoring.NOCOLOR]) * size
+
+
+
+class _Table(dict):
+  """ A dict that returns -1 for missing keys as an array filled by -1 does. """
+
+  def __missing__(self, key):
+    return -1
+
+
+
+class EdgeColoring(Mapping):
+  """
+  An edge coloring stored as an array of colors aligned with edge positions 
+  of a `CSRGraph`, i.e. the color of the edge on position `k` of `indices` is 
+  `colors[k]`. The array takes 2 bytes per edge position for less than 2 ** 15
+  colors.
+
+  It is also a lazy read-only view of the coloring as a dict, so that 
+  `coloring[start, end]` gives the color of the edge (start, end), and the 
+  iteration goes over the edges (start, end) in the order of `indices`.
+
+  Attributes:
+    graph(:obj:`CSRGraph`) - a graph which edges are colored.
+
+    colors(:obj:`array` of int) - colors of edge positions of `graph`.
+  """
 
   NOCOLOR = -1
 
+  def __init__(self, graph, colors):
+    self.graph = graph
+    self.colors = colors
+
+
+  def __getitem__(self, edge):
+    start, end = edge
+
+    if 0 <= start < self.graph.vertices_num:
+      position = self.graph.indptr[start]
+
+      for vertex in self.graph.edges[start]:
+        if vertex == end:
+          return self.colors[position]
+        position += 1
+
+    raise KeyError(edge)
+
+
+  def __iter__(self):
+    for start, incidence in enumerate(self.graph.edges):
+      for end in incidence:
+        yield start, end
+
+
+  def __len__(self):
+    return len(self.colors)
+
+
+  def __repr__(self):
+    return repr(self.to_dict())
+
+
+  def values(self):
+    return self.colors.tolist()
+
+
+  def items(self):
+    return zip(self, self.colors)
+
+
+  def get_colors(self, start, ends):
+    """ Returns colors of the edges from `start` to each of `ends`. If `ends` 
+    are the incidence of `start` the colors are taken without search. """
+    incidence = self.graph.edges[start]
+
+    if len(incidence) == len(ends) and \
+       all(one == two for one, two in zip(incidence, ends)):
+      position = self.graph.indptr[start]
+      return self.colors[position:position + len(incidence)]
+
+    return [ self[start, end] for end in ends ]
+
+
+  def to_dict(self):
+    """ Returns the coloring as a dict of (start, end) - color. """
+    return dict(self.items())
+
+
+
+class VisingColoring:
+  """
+  Edge coloring of a bipartite graph by alternating paths. 
+
+  The graph is kept as a `CSRGraph` and the colors - as an array aligned with
+  its edge positions, both halves of an undirected edge are colored together.
+  So each edge of the graph should be given in both directions as `UDGraph` 
+  does.
+  
+  For each vertex the colors of its edges are kept as a bitmask `used`, so a 
+  missing color is found by bit operations, and a table `position` maps a pair
+  of a vertex and a color to the position of the edge of this color, so an 
+  alternating path is followed in O(1) time per edge. Both are updated in 
+  `set_color`. The table is an array of `vertices_num * colors_num` positions 
+  if it is not much larger than the graph, otherwise a dict.
+  """
+
+  NOCOLOR = EdgeColoring.NOCOLOR
+
   def __init__(self, graph):
 
+    if not isinstance(graph, bipartite.graph.CSRGraph):
+      graph = bipartite.graph.CSRGraph(graph=graph)
+
     self.graph = graph
+    self.twins = graph.edge_twins()
 
     # All colors need to color a given graph. See Vising's Theorem [1]
+    self.colors_num = graph.max_degree
     self.all_colors = set(range(graph.max_degree)) 
+    self.all_colors_mask = (1 << graph.max_degree) - 1
+
+    self.color = _color_array(self.colors_num, len(graph.indices))
 
-    self.color = dict()
-    for start, incidents in enumerate(graph.edges):
-      for end in incidents:
-        self.color[start, end] = self.NOCOLOR
+    self.used = [0] * graph.vertices_num
+
+    table_size = graph.vertices_num * self.colors_num
+    if table_size <= 2 * len(graph.indices):
+      self.position = array('i', [-1]) * table_size
+    else:
+      self.position = _Table()
   
 
   def __call__(self):
@@ -64,30 +397,60 @@ class VisingColoring:
     return self.colorize()
 
 
-  def set_color(self, vone, vtwo, color):
-    """ Set color of an edge of an undirected graph. """
+  def set_color(self, vertex, position, color):
+    """ Set color of an edge of an undirected graph given by its start `vertex`
+    and its `position`. The color `NOCOLOR` uncolors the edge. """
+
+    twin = self.twins[position]
+    end = self.graph.indices[position]
+    color_old = self.color[position]
+
+    if color_old != self.NOCOLOR:
+      self.used[vertex] &= ~(1 << color_old)
+      self.used[end] &= ~(1 << color_old)
+      self.position[vertex * self.colors_num + color_old] = -1
+      self.position[end * self.colors_num + color_old] = -1
 
-    self.color[vone, vtwo] = color
-    self.color[vtwo, vone] = color
+    self.color[position] = color
+    self.color[twin] = color
+
+    if color != self.NOCOLOR:
+      self.used[vertex] |= 1 << color
+      self.used[end] |= 1 << color
+      self.position[vertex * self.colors_num + color] = position
+      self.position[end * self.colors_num + color] = twin
 
 
   def get_missing_colors(self, vertex):
     """ Get a set of missing colors for a vertex specified. """
 
-    colors_used = { self.color[vertex, end] for end in self.graph.edges[vertex] }
-    return self.all_colors - colors_used
+    return { color for color in self.all_colors 
+                     if not self.used[vertex] >> color & 1 }
+
+
+  def get_missing_color(self, vertex):
+    """ Get the least missing color for a vertex specified. """
 
+    used = self.used[vertex]
+    return (~used & (used + 1)).bit_length() - 1
 
-  def get_neighbor(self, vertex, exclude, color):
+
+  def get_common_missing_color(self, vone, vtwo):
+    """ Get the least color missing for both vertices, if any, otherwise 
+    return None. """
+
+    common = ~(self.used[vone] | self.used[vtwo]) & self.all_colors_mask
+    return (common & -common).bit_length() - 1 if common else None
+
+
+  def get_edge(self, vertex, color):
     """ 
-    Get an neighboring vertex such that a correspongin edge has color specified. 
+    Get the position of an edge of a vertex such that the edge has color 
+    specified, if any, otherwise return None. 
     """
 
-    for end in self.graph.edges[vertex]:
-      if self.color[vertex, end] == color and end != exclude:
-        return end
-    
-    return None
+    position = self.position[vertex * self.colors_num + color]
+    return position if position >= 0 else None
 
 
   def colorize(self):
@@ -95,40 +458,49 @@ class VisingColoring:
     The method finds an edge coloring of an undirtected graph using Vising's
     algorithm.
     """
+    indptr, indices = self.graph.indptr, self.graph.indices
 
-    for start, end in self.color.keys():
+    for start in self.graph.get_vertices():
+      for position in range(indptr[start], indptr[start + 1]):
 
-      if self.color[start, end] != self.NOCOLOR:
-        continue
-      
-      missing_colorset_start = self.get_missing_colors(start)
-      missing_colorset_end   = self.get_missing_colors(end)
-      missing_colorset_common = missing_colorset_start.intersection(
-          missing_colorset_end)
-
-      if missing_colorset_common:
-        missing_color = missing_colorset_common.pop()
-        self.set_color(start, end, missing_color)
-        continue
+        if self.color[position] != self.NOCOLOR:
+          continue
 
-      color = missing_colorset_start.pop()
-      color_next = missing_colorset_end.pop()
-      vertex = end
-      vertex_next = self.get_neighbor(end, start, color)
+        end = indices[position]
+        missing_color = self.get_common_missing_color(start, end)
 
-      self.set_color(start, end, color)
+        if missing_color is not None:
+          self.set_color(start, position, missing_color)
+          continue
 
-      # Building an alternating path.
-      while vertex_next is not None:
-        
-        self.set_color(vertex, vertex_next, color_next)
+        color = self.get_missing_color(start)
+        color_next = self.get_missing_color(end)
 
-        vertex_next, vertex = \
-            self.get_neighbor(vertex_next, vertex, color_next), vertex_next
-        
-        color, color_next = color_next, color
+        # Building an alternating path of colors `color` and `color_next` 
+        # starting from `end` as a list of pairs: vertex - edge position.
+        path = list()
+        path_color = color
+        vertex = end
+        path_position = self.get_edge(end, color)
+
+        while path_position is not None:
+          path.append((vertex, path_position))
+          vertex = indices[path_position]
+          path_color = color_next if path_color == color else color
+          path_position = self.get_edge(vertex, path_color)
+
+        # Swap the colors of the path. The edges are uncolored first not to 
+        # have two edges of the same color at a vertex in between.
+        for vertex, path_position in path:
+          self.set_color(vertex, path_position, self.NOCOLOR)
 
-    return self.color
+        for index, (vertex, path_position) in enumerate(path):
+          self.set_color(vertex, path_position, 
+                         color if index % 2 else color_next)
+
+        self.set_color(start, position, color)
+
+    return EdgeColoring(self.graph, self.color)
 
 
 
@@ -137,13 +509,13 @@ def is_valid(coloring, graph):
 
   for start, incidents in enumerate(graph.edges):
     
-    colorset = set()
-    
-    for end in incidents:
-      if coloring[start, end] in colorset:
-        return False
-      
-      colorset.add(coloring[start, end])
+    if isinstance(coloring, EdgeColoring):
+      colors = coloring.get_colors(start, incidents)
+    else:
+      colors = [ coloring[start, end] for end in incidents ]
+
+    if len(set(colors)) < len(colors):
+      return False
 
   return True 
 
@@ -152,42 +524,303 @@ def is_valid(coloring, graph):
 import bipartite.matching
 
 class ColeHopcroftColoring:
+  """
+  Edge coloring of a bipartite graph by Euler splits [1, 2]. If the maximum 
+  degree of a graph is even the graph is split into two subgraphs of a half 
+  maximum degree, otherwise a matching covering maximum degree vertices is 
+  colored by a single color and removed.
+
+  The subgraphs are never built: the edges are kept in a pair of arrays, each 
+  subgraph is a range of positions in them and a split reorders its range in 
+  place. The ranges to color are kept in a stack instead of recursion.
+  """
+
+  NOCOLOR = EdgeColoring.NOCOLOR
 
   def __init__(self, graph):
+
+    if not isinstance(graph, bipartite.graph.CSRGraph):
+      graph = bipartite.graph.CSRGraph(graph=graph)
+
     self.graph = graph
-    self.coloring = list()
+    self.color = None
+
 
   def __call__(self):
-    return self.colorize(self.graph)
-  
-  def colorize(self, graph):
+    return self.colorize()
+
+
+  def colorize(self):
+    """ 
+    The method finds an edge coloring of a bipartite graph. Each edge (start, 
+    end) of the graph is taken once as start < end.
 
-    if graph.max_degree % 2:
+    Returns:
+      :obj:`EdgeColoring`: - the resulting coloring of edges as 
+          `VisingColoring` does.
+    """
+    indptr, indices = self.graph.indptr, self.graph.indices
+    starts, ends, ids = array('i'), array('i'), array('i')
+
+    for start in self.graph.get_vertices():
+      for position in range(indptr[start], indptr[start + 1]):
+        if start < indices[position]:
+          starts.append(start)
+          ends.append(indices[position])
+          ids.append(position)
+
+    edges_num = len(starts)
+    vertices_num = self.graph.vertices_num
+
+    # Room for auxiliary edges of covering matchings
+    starts.extend(array('i', [0]) * vertices_num)
+    ends.extend(array('i', [0]) * vertices_num)
+
+    splitter = bipartite.matching.EulerSplitter(
+        starts, ends, vertices_num, edges_num, ids)
+
+    twins = self.graph.edge_twins()
+    self.color = _color_array(self.graph.max_degree, len(indices))
+
+    # Each item is a range of edge positions, the maximum degree of a subgraph
+    # and the first color of the subgraph.
+    stack = [ (0, edges_num, self.graph.max_degree, 0) ]
+
+    while stack:
+      lo, hi, degree, color = stack.pop()
+
+      if lo == hi:
+        continue
+
+      if degree == 1:
+        for position in ids[lo:hi]:
+          self.color[position] = color
+          self.color[twins[position]] = color
       
-      if graph.max_degree == 1:
-        self.coloring.append(graph)
+      elif degree % 2:
+        mid = splitter.cover(lo, hi, degree)
+        stack.append((lo, mid, 1, color))
+        stack.append((mid, hi, degree - 1, color + 1))
+
+      else:
+        mid = splitter.split(lo, hi)
+        stack.append((lo, mid, degree // 2, color))
+        stack.append((mid, hi, degree // 2, color + degree // 2))
+
+    return EdgeColoring(self.graph, self.color)
+
+
+
+class AlonColoring:
+  """
+  Edge coloring of a bipartite graph by Alon's algorithm [3]. The graph is 
+  made `max_degree`-regular first: the vertices of each part are merged into
+  bins of total degree at most `max_degree`, and the bins are filled up by 
+  auxiliary weighted edges. If the degree of a regular graph is even the graph
+  is split into two regular subgraphs of a half degree, otherwise a perfect 
+  matching is found, colored by a single color and removed. A perfect matching
+  is found by scaling the weights of edges so that the degree is a power of 
+  two `2 ** t`, adding a weighted "bad" perfect matching to complete the degree
+  and halving the graph `t` times keeping the half of less bad weight. Overall
+  it takes O(E log E) time.
+
+  Edges of a bin graph are kept in a pair of arrays shared by all subgraphs, 
+  and each subgraph is a list of positions in them with their weights.
+
+  References:
+    [3] Noga Alon. A Simple Algorithm for Edge-Coloring Bipartite 
+    Multigraphs // Information Processing Letters, Vol. 85, No. 6, 
+    pp. 301-302, 2003.
+  """
+
+  NOCOLOR = EdgeColoring.NOCOLOR
+
+  def __init__(self, graph):
+
+    if not isinstance(graph, bipartite.graph.CSRGraph):
+      graph = bipartite.graph.CSRGraph(graph=graph)
+
+    self.graph = graph
+    self.color = None
+
+
+  def __call__(self):
+    return self.colorize()
+
+
+  def colorize(self):
+    """ 
+    The method finds an edge coloring of a bipartite graph. Each edge (start, 
+    end) of the graph is taken once as start < end.
+
+    Returns:
+      :obj:`EdgeColoring`: - the resulting coloring of edges as 
+          `VisingColoring` does, or None if the graph is not bipartite.
+    """
+    parts = bipartite.tools.bipartition(self.graph)
+
+    if parts is None:
+      return None
+
+    degree = self.graph.max_degree
+    bins, bins_num = self.__get_bins(parts)
+
+    indptr, indices = self.graph.indptr, self.graph.indices
+    starts, ends, ids = array('i'), array('i'), array('i')
+
+    # Edges of the bin graph are directed from part 0 to part 1
+    for start in self.graph.get_vertices():
+      for position in range(indptr[start], indptr[start + 1]):
+        end = indices[position]
+
+        if start < end:
+          if parts[start]:
+            start, end = end, start
+          starts.append(bins[start])
+          ends.append(bins[end])
+          ids.append(position)
+
+    positions = list(range(len(starts)))
+    weights = [1] * len(starts)
+
+    # Fill up the bins to the degree by auxiliary edges
+    loads = [0] * (2 * bins_num)
+    for start, end in zip(starts, ends):
+      loads[start] += 1
+      loads[end] += 1
+
+    one, two = 0, bins_num
+    while one < bins_num and two < 2 * bins_num:
+
+      weight = min(degree - loads[one], degree - loads[two])
+
+      if weight:
+        positions.append(len(starts))
+        weights.append(weight)
+        starts.append(one)
+        ends.append(two)
+        ids.append(-1)
+        loads[one] += weight
+        loads[two] += weight
+
+      if loads[one] == degree:
+        one += 1
+      if loads[two] == degree:
+        two += 1
+
+    self.edges_num = len(starts)
+    self.bins_num = bins_num
+
+    # Room for bad matchings
+    starts.extend(range(bins_num))
+    ends.extend(range(bins_num, 2 * bins_num))
+
+    self.splitter = bipartite.matching.EulerSplitter(
+        starts, ends, 2 * bins_num, self.edges_num)
+
+    twins = self.graph.edge_twins()
+    self.color = _color_array(degree, len(indices))
+
+    stack = [ (positions, weights, degree, 0) ]
+
+    while stack:
+      positions, weights, degree, color = stack.pop()
+
+      if not positions:
+        continue
+
+      if degree == 1:
+        matching, rest = positions, None
+      
+      elif degree % 2:
+        matching = self.__get_perfect_matching(positions, weights, degree)
+
+        matched = set(matching)
+        rest = [ (p, w - (p in matched)) for p, w in zip(positions, weights) 
+                   if w > (p in matched) ]
+        
+        stack.append(([ p for p, _ in rest ], [ w for _, w in rest ], 
+                      degree - 1, color + 1))
       
       else:
-        matching, rest = bipartite.matching.covering_matching(graph)
-        self.coloring.append(matching)
-        self.colorize(rest)
-    
-    else:
+        one, two = self.splitter.halve(positions, weights)
+        stack.append((*one, degree // 2, color))
+        stack.append((*two, degree // 2, color + degree // 2))
+        continue
+
+      for position in matching:
+        if ids[position] >= 0:
+          self.color[ids[position]] = color
+          self.color[twins[ids[position]]] = color
+
+    return EdgeColoring(self.graph, self.color)
+
 
-      one, two = bipartite.matching.euler_split(graph)
-      self.colorize(one)
-      self.colorize(two)
+  def __get_perfect_matching(self, positions, weights, degree):
+    """ Returns positions of a perfect matching of a regular bin graph of an 
+    odd degree. """
 
-    return self.coloring
+    power = 1
+    while power < degree * self.bins_num:
+      power *= 2
 
+    alpha = power // degree
+    beta = power - alpha * degree
 
-  @staticmethod
-  def to_commmon_form(coloring):
+    # The subgraph is halved in place in the scratch arrays of the splitter
+    work, work_weights = self.splitter.work, self.splitter.weights
+    size = 0
 
-    return { (start, end[0]): color
-              for color, matching in enumerate(coloring)
-              for start, end in enumerate(matching.edges) if end }
+    for position, weight in zip(positions, weights):
+      work[size] = position
+      work_weights[position] = alpha * weight
+      size += 1
 
+    for position in range(self.edges_num, self.edges_num + self.bins_num):
+      work[size] = position
+      work_weights[position] = beta
+      size += 1
+
+    # Keep the half with less weight of the bad matching
+    while power > 1:
+      size = self.splitter.keep_half(size)
+      power //= 2
+
+    return work[:size]
+
+
+  def __get_bins(self, parts):
+    """ 
+    Merges vertices of each part into bins of total degree at most maximum 
+    degree of the graph. Returns an array of bins of vertices and the number of
+    bins in a part; the bins of part 0 are numbered first, then of part 1.
+    """
+    bins = array('i', [-1]) * self.graph.vertices_num
+    bins_num = [0, 0]
+    loads = [0, 0]
+
+    for vertex in self.graph.get_vertices():
+      degree = self.graph.degree(vertex)
+
+      if not degree:
+        continue
+
+      part = parts[vertex]
+
+      if not bins_num[part] or loads[part] + degree > self.graph.max_degree:
+        bins_num[part] += 1
+        loads[part] = 0
+
+      bins[vertex] = bins_num[part] - 1
+      loads[part] += degree
+
+    bins_max = max(bins_num)
+
+    for vertex in self.graph.get_vertices():
+      if parts[vertex] and bins[vertex] >= 0:
+        bins[vertex] += bins_max
+
+    return bins, bins_max
 
 
 if __name__ == '__main__':
@@ -201,12 +834,4 @@ if __name__ == '__main__':
 
   print('coloring', coloring)
 
-  f_coloring = ColeHopcroftColoring.to_commmon_form(coloring)
-
-  print('formatted', f_coloring)
-
-  graph = bipartite.graph.UDGraph(edges=
-      [ (0, 3), (0, 4), (1, 3), (1, 4), (1, 5), (2, 3)])
-
-  print('is valid?', is_valid(f_coloring, graph))
-
+  print('is valid?', is_valid(coloring, graph))
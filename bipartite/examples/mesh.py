@@ -1,4 +1,6 @@
+import os
 import random
+import sys
 
 import bipartite.generating
 import bipartite.coloring
@@ -8,17 +10,49 @@ import bipartite.spanning
 if __name__ == '__main__':
 
   vertices_num = 10  
+  seed = 0
+  params = (100, 200, (800, 800), (25,25))
 
-  gen = bipartite.generating.Geo(100, 200, (800, 800), (25,25))
-  graph = gen(vertices_num)
+  # The graph is generated once and then loaded from a file, which is mapped 
+  # into memory without reading it. The file is given by the first argument,
+  # otherwise it is kept in the cache directory of the user and its name is 
+  # keyed on the seed and the parameters of the generator.
+  if len(sys.argv) > 1:
+    path = sys.argv[1]
+
+  else:
+    cache_dir = os.path.join(os.environ.get('XDG_CACHE_HOME') or 
+                             os.path.expanduser(os.path.join('~', '.cache')),
+                             'pygraphs')
+    os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+
+    r_disable, r_allowed, (width, height), (rows, cols) = params
+    path = os.path.join(cache_dir, 
+                        f'mesh-{vertices_num}-{r_disable}-{r_allowed}-'
+                        f'{width}x{height}-{rows}x{cols}-seed{seed}.graph')
+
+  graph = None
+  if os.path.exists(path):
+    try:
+      graph = bipartite.graph.Graph.load(path)
+      print('loaded', path)
+
+    except (OSError, ValueError) as error:
+      print('regenerating, cannot load', path, error)
+
+  if graph is None or graph.vertices_num != vertices_num:
+    gen = bipartite.generating.Geo(*params, seed=seed)
+    graph = gen(vertices_num)
+    graph.save(path)
+
+    gen.show('scene')
+    print('Valid?', gen.is_valid())
+    print('edges', gen._edges)
 
-  gen.show('scene')
-  print('Valid?', gen.is_valid())
-  print('edges', gen._edges)
   print('initial', graph)
 
   spanning = bipartite.spanning.SpanningBGraph(graph)
-  init_coloring = tuple(random.choices([0,1], k=vertices_num))
+  init_coloring = tuple(random.Random(seed).choices([0,1], k=vertices_num))
   bgraph = spanning(init_coloring, vertices_num)
   bgraph_con = spanning.reindex()
 
@@ -36,17 +70,9 @@ if __name__ == '__main__':
   print('Vising is valid?', bipartite.coloring.is_valid(coloring, bgraph))
   # print('is valid?', bipartite.coloring.is_valid(coloring_con, bgraph_con))
 
-  graph_copy = bipartite.graph.UDGraph(graph=bgraph)
-
-  print('coppied', graph_copy)
-  ch_coloring = bipartite.coloring.colorize(graph_copy, 
-                                            algorithm='Cole-Hopcroft')
+  ch_coloring = bipartite.coloring.colorize(bgraph, algorithm='Cole-Hopcroft')
 
   print('Cole-Hopcroft coloring', ch_coloring)
 
-  f_ch_coloring = bipartite.coloring.ColeHopcroftColoring.to_commmon_form(
-        ch_coloring)
-  
-  print('formatted', f_ch_coloring)
-
-  print('Cole-Hopcroft is valid?',bipartite.coloring.is_valid(coloring, bgraph))
+  print('Cole-Hopcroft is valid?',
+        bipartite.coloring.is_valid(ch_coloring, bgraph))
@@ -9,9 +9,18 @@ import bipartite.graph
 import random
 import math
 
-def bgraph(vertices_num, vratio_low=0.2, vratio_high=0.8, edge_prob=0.5):
+try:
+  import numpy
+except ImportError:
+  numpy = None
+
+def bgraph(vertices_num, vratio_low=0.2, vratio_high=0.8, edge_prob=0.5, 
+           seed=None):
     """
-    Generates a random bipartite graph. 
+    Generates a random bipartite graph. Each edge between the parts is present
+    with probability `edge_prob` independently. Instead of a draw per pair of 
+    vertices, the number of pairs skipped till the next edge is drawn from the
+    geometric distribution [1], so it takes O(V + E) time.
     
     Args:
       vertices_num (int) - a number of graph vertices.
@@ -24,28 +33,70 @@ def bgraph(vertices_num, vratio_low=0.2, vratio_high=0.8, edge_prob=0.5):
       vratio_high (float) - the same as `vratio_low`, but specifies upper bound.
 
       edge_prob (float) - a floating number from an interval [0,1] - an edge 
-          probability.
+          probability. A graph has no edges if it is 0.
+
+      seed (int or :obj:`random.Random`, optional) - a seed or a generator of
+          random numbers. Default to None, then the `random` module is used.
 
     Return:
       :obj:'Graph' - a generated graph.
+
+    References:
+      [1] Vladimir Batagelj, and Ulrik Brandes. Efficient generation of large
+      random networks // Physical Review E, Vol. 71, No. 3, 036113, 2005.
     
     """
 
     # We apply the rule that part one of vertices is stored in the first
     # portion of the list, and part two - in the second.
 
-    edges = list()
-    part_one = round(random.uniform(vratio_low, vratio_high) * vertices_num)
+    rng = _get_random(seed)
+    part_one = round(rng.uniform(vratio_low, vratio_high) * vertices_num)
+    part_two = vertices_num - part_one
+
+    graph = bipartite.graph.Graph(vertices_num=vertices_num)
+    pairs = part_one * part_two
+    
+    if edge_prob <= 0:
+      return graph
+
+    # log1p keeps the log of the skip probability non-zero for a tiny 
+    # `edge_prob`, when 1 - `edge_prob` is rounded to 1
+    log_skip = math.log1p(-edge_prob) if edge_prob < 1 else None
+    pair = -1
 
-    for start in range(part_one):
-      for end in range(part_one, vertices_num):
-        
-        if random.random() < edge_prob and (start, end) not in edges:
-          
-          edges.append((start, end))
-          edges.append((end, start))
+    while True:
+
+      pair += 1
+
+      if log_skip is not None:
+        pair += int(math.log1p(-rng.random()) / log_skip)
+
+      if pair >= pairs:
+        break
+
+      start, end = divmod(pair, part_two)
+      end += part_one
+
+      graph.edges[start].append(end)
+      graph.edges[end].append(start)
     
-    return bipartite.graph.Graph(edges=edges)
+    graph.update_max_degree()
+
+    return graph
+
+
+def _get_random(seed):
+  """ Returns a generator of random numbers given by a seed: the `random` 
+  module if it is None, a new `random.Random` if it is int, otherwise `seed` 
+  itself. """
+  if seed is None:
+    return random
+
+  if isinstance(seed, random.Random):
+    return seed
+  
+  return random.Random(seed)
 
 
 def cycle(vertices_num):
@@ -67,10 +118,10 @@ def cycle(vertices_num):
 
 def grid(size):
   """
-  Generates an undirected graph each vertices forms a quadratic grid for which a 
-  number of the vertices on a side is specified, that is exactly 4 vertices has 
-  degree 2, (`size` - 2) * 4 vertices has degree 3 and the other (`size` - 2) *
-  (`size` - 2) vertices (inner) has degree 4:
+  Generates an undirected graph each vertices forms a quadratic grid for which
+  a number of the vertices on a side is specified, that is exactly 4 vertices 
+  has degree 2, (`size` - 2) * 4 vertices has degree 3 and the other 
+  (`size` - 2) * (`size` - 2) vertices (inner) has degree 4:
 
             * -- * -- *
             |    |    |
@@ -97,7 +148,13 @@ def grid(size):
 class Geo:
   """ Generation a random undirected via placing vertices on the map (scene) """
 
-  def __init__(self, r_disable, r_allowed, area, grid):
+  # The rules by which scene values are changed when mask is applied.
+  MASK = [[0, 1, 2],
+          [1, 1, 2],
+          [2, 2, 2]]
+
+  def __init__(self, r_disable, r_allowed, area, grid, seed=None, 
+               use_numpy=False):
     """
     Initialize a generator. To launch generator call the object.
 
@@ -106,6 +163,10 @@ class Geo:
       r_allowed (float) - a maximum radius between any two spots
       area (float, float) - 2D-region inside which spots are generated
       grid (int, int) - the size of grid
+      seed (int or :obj:`random.Random`, optional) - a seed or a generator of
+          random numbers. Default to None, then the `random` module is used.
+      use_numpy (bool, optional) - whether to keep the scene in a NumPy array 
+          and apply the mask by slices. It requires NumPy. Default to False.
     """
     self.r_disable = r_disable ** 2
     self.r_allowed = r_allowed ** 2
@@ -123,11 +184,22 @@ class Geo:
 
     self.mask = self.get_mask()
     self.scene = [ [0 
-        for _ in range(self.grid[0]) ] 
-        for _ in range(self.grid[1]) ]
+        for _ in range(self.grid[1]) ] 
+        for _ in range(self.grid[0]) ]
+
+    if use_numpy:
+      if numpy is None:
+        raise ImportError('NumPy is required by Geo with use_numpy=True')
+      
+      self.scene = numpy.zeros(self.grid, dtype=numpy.uint8)
+      self._mask_array = numpy.array(self.mask, dtype=numpy.uint8)
+      self._transitions = numpy.array(Geo.MASK, dtype=numpy.uint8)
     
+    self._random = _get_random(seed)
+
     self._places = list()
-    self._available = set()
+    self._available = list() # available places
+    self._positions = dict() # a mapping storing pairs place - its position
     self._edges = list()
   
 
@@ -141,28 +213,44 @@ class Geo:
     self.generate(vertices_num)
     self.make_edges()
 
-    print(self._edges)
-
     return bipartite.graph.UDGraph(edges=self._edges, vertices_num=vertices_num)
   
 
   def make_edges(self):
-    """ Generate list of edges based on spots generated """
-    for one in range(len(self._places)):
-      for two in range(one + 1, len(self._places)):
-        distance = self.distance(self._places[one], self._places[two])
-        if distance < self.r_allowed:
-          self._edges.append((one, two))
+    """ Generate list of edges based on spots generated. The spots are put into
+    buckets of `mask_center + 1` cells a side, so spots closer than 
+    `r_allowed` lie in the same or adjacent buckets and only they are compared.
+    As spots are at least `r_disable` apart, it takes O(n + E) time. """
+    self._edges = list()
+    side = (self.mask_center[0] + 1, self.mask_center[1] + 1)
+    buckets = dict()
+
+    for index, place in enumerate(self._places):
+      bucket = (place[0] // side[0], place[1] // side[1])
+      buckets.setdefault(bucket, []).append(index)
+
+    for one, place in enumerate(self._places):
+      x, y = place[0] // side[0], place[1] // side[1]
+
+      close = [ two for dx in (-1, 0, 1) for dy in (-1, 0, 1) 
+                    for two in buckets.get((x + dx, y + dy), ()) 
+                    if two > one and 
+                       self.distance(place, self._places[two]) < 
+                       self.r_allowed ]
+      close.sort()
+
+      self._edges.extend((one, two) for two in close)
   
 
   def generate(self, vertices_num):
     """ Generate in the loop a random position among available ones and apply 
     the mask to each position. """
 
-    self._available = set()
+    self._available = list()
+    self._positions = dict()
     
-    init_place = (random.randint(0, self.grid[0] - 1), 
-                  random.randint(0, self.grid[1] - 1))
+    init_place = (self._random.randint(0, self.grid[0] - 1), 
+                  self._random.randint(0, self.grid[1] - 1))
     self._places = [init_place]
 
     self._apply_mask(init_place)
@@ -175,24 +263,33 @@ class Geo:
     
   
   def random_choice(self, seq):
-    """ Returns a random element from the sequence. """
-    i_choice = random.randint(0, len(seq) - 1)
-    
-    for i, place in enumerate(seq):
-      if i == i_choice:
-        return place
-    
-    return None
+    """ Returns a random element from the sequence in O(1) time. """
+    if not seq:
+      return None
+
+    return seq[self._random.randrange(len(seq))]
+
+
+  def _add_available(self, place):
+    """ Adds a place to available ones. """
+    self._positions[place] = len(self._available)
+    self._available.append(place)
+
+
+  def _remove_available(self, place):
+    """ Removes a place from available ones in O(1) time by moving the last 
+    available place to its position. """
+    position = self._positions.pop(place)
+    last = self._available.pop()
+
+    if last != place:
+      self._available[position] = last
+      self._positions[last] = position
 
   
   def _apply_mask(self, place):
     """ Apply mask to the scene with proper positioning to the scene and update 
     available places. """
-    # The rules by which scene values are changed when mask is applied.
-    MASK = [[0, 1, 2],
-            [1, 1, 2],
-            [2, 2, 2]]
-    
     # The posisition of the left up angle of the mask on the scene.
     mask_pos = (place[0] - self.mask_center[0], 
                 place[1] - self.mask_center[1])
@@ -204,30 +301,62 @@ class Geo:
 
     mask_end = (
         self.grid[0] - mask_pos[0]
-          if mask_pos[0] + mask_pos[0] > self.grid[0] 
+          if mask_pos[0] + self.mask_size[0] > self.grid[0] 
           else self.mask_size[0],
 
         self.grid[1] - mask_pos[1]
           if mask_pos[1] + self.mask_size[1] > self.grid[1] 
-          else self. mask_size[1]
+          else self.mask_size[1]
     )
 
+    if numpy is not None and isinstance(self.scene, numpy.ndarray):
+      self._apply_mask_numpy(mask_pos, mask_start, mask_end)
+      return
+
     for x in range(mask_start[0], mask_end[0]):
+
+      row, mask_row = self.scene[x + mask_pos[0]], self.mask[x]
+
       for y in range(mask_start[1], mask_end[1]):
 
-        shift = (x + mask_pos[0], 
-                 y + mask_pos[1])
+        # A neutral cell of the mask does not change the scene.
+        if not mask_row[y]:
+          continue
+
+        old = row[y + mask_pos[1]]
+        new = Geo.MASK[old][mask_row[y]]
+
+        if new != old:
+          row[y + mask_pos[1]] = new
+          self._update_available((x + mask_pos[0], y + mask_pos[1]), old, new)
+
+
+  def _apply_mask_numpy(self, mask_pos, mask_start, mask_end):
+    """ Apply mask to a NumPy scene as a clipped slice with a lookup table, 
+    then update available places by the changed cells in the same order as
+    `_apply_mask` does. """
+    scene = self.scene[mask_pos[0] + mask_start[0]:mask_pos[0] + mask_end[0],
+                       mask_pos[1] + mask_start[1]:mask_pos[1] + mask_end[1]]
+    mask = self._mask_array[mask_start[0]:mask_end[0], 
+                            mask_start[1]:mask_end[1]]
 
-        old = self.scene[shift[0]][shift[1]]
+    new = self._transitions[scene, mask]
+    changed = numpy.argwhere(new != scene)
+    old = scene[changed[:, 0], changed[:, 1]].tolist()
+    scene[...] = new
 
-        self.scene[shift[0]][shift[1]] = \
-            MASK[ self.scene[shift[0]][shift[1]] ][ self.mask[x][y]]
-        
-        if old == 1 and self.scene[shift[0]][shift[1]] == 2:
-          self._available.remove(shift)
-        
-        if old == 0 and self.scene[shift[0]][shift[1]] == 1:
-          self._available.add(shift)
+    for (x, y), old_value in zip(changed.tolist(), old):
+      place = (x + mask_pos[0] + mask_start[0], y + mask_pos[1] + mask_start[1])
+      self._update_available(place, old_value, int(new[x, y]))
+
+
+  def _update_available(self, place, old, new):
+    """ Updates available places by a change of a scene cell. """
+    if old == 1 and new == 2:
+      self._remove_available(place)
+    
+    if old == 0 and new == 1:
+      self._add_available(place)
 
 
   def distance(self, i, j):
@@ -267,7 +396,12 @@ class Geo:
   def show(self, name):
     """ Display area: mask or scene. """
 
-    area = self.scene if name == 'scene' else \
+    scene = self.scene
+
+    if numpy is not None and isinstance(scene, numpy.ndarray):
+      scene = scene.tolist()
+
+    area = scene if name == 'scene' else \
            self.mask  if name == 'mask'  else [[]]
     
     for pos in self._places:
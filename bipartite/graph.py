@@ -4,6 +4,23 @@ structure describing graphs in this package.
 
 https://github.com/severmore/pygraphs
 """
+import struct
+import sys
+from array import array
+from mmap import ACCESS_READ, mmap as memory_map
+
+# The binary graph file is a header followed by `indptr` as 8-byte and 
+# `indices` as 4-byte little-endian ints, see `Graph.save`. All fields are 
+# aligned to 8 bytes, so the buffers can be mapped and cast without copying.
+_FILE_HEADER = struct.Struct('<4sHHqqqq')
+_FILE_MAGIC = b'BPGR'
+_FILE_VERSION = 1
+_FILE_UNDIRECTED = 1
+
+# The number of ints buffered while a graph is written.
+_FILE_CHUNK = 1 << 16
+
+
 class Graph:
   """
   A graph representation used in the algorithms of this package. It is intended
@@ -30,8 +47,8 @@ class Graph:
     Keyword args:
 
       edges (:obj:`list` of :obj:`turple` of int, optional): a list of edges 
-          each element of which is a tuple of size two: (start - end). Default 
-          to None.
+          each element of which is a tuple of size two: (start - end). It may be
+          any iterable of pairs, it is read once. Default to None.
     
       graph (:obj:`Graph`, optional): a graph which edges will be copied to a 
           new graph. If `edges` and `graph` are both not None then the edges of 
@@ -44,33 +61,98 @@ class Graph:
           variables. The parameter is used to speed up. Default to 0.
     """
 
-    if not vertices_num:
-      # As a set of vertices represented as a consequtive integer number it's
-      # sufficient to find the gretest one in the list given
-      if edges:
-        vertices_num = max(max(edges, key=lambda x: max(x[0], x[1]))) + 1
-      
-      # In the graph object vertices is already structed into the list
-      if graph:
-        v_max = len(graph.edges)
-        
-        if v_max > vertices_num:
-          vertices_num = v_max
-    
-    self.vertices_num = vertices_num
-    self.edges = [[] for _ in self.get_vertices()]
+    self.vertices_num = 0
+    self.edges = list()
+    self.max_degree = 0
+
+    # The vertices are added on demand while edges are read, so `edges` is 
+    # read in a single pass and may be any iterable, e.g. a generator.
+    self._grow(max(vertices_num, len(graph.edges) if graph else 0))
 
-    if edges:
-      for start, end in edges:
-        self.edges[start].append(end)
+    halves = self._read_edges(edges) if edges is not None else None
 
     if graph:
       for start, ends in enumerate(graph.edges):
         self.edges[start].extend(ends)
+
+        if len(self.edges[start]) > self.max_degree:
+          self.max_degree = len(self.edges[start])
+
+    # The reverse halves of `edges` of an undirected graph follow the edges of
+    # `graph`, see `UDGraph`
+    if halves:
+      for start, ends in enumerate(halves):
+        if ends:
+          self.edges[start].extend(ends)
+
+          if len(self.edges[start]) > self.max_degree:
+            self.max_degree = len(self.edges[start])
+
+
+  @classmethod
+  def from_arrays(cls, starts, ends, vertices_num=0):
+    """
+    Create a new graph from two sequences of the same length, e.g. `array` or 
+    NumPy arrays, where the edge `i` is (`starts[i]`, `ends[i]`).
+
+    Args:
+      starts (sequence of int): the starts of edges.
+
+      ends (sequence of int): the ends of edges.
+
+      vertices_num (int, optional): the intended number of vertices. Default 
+          to 0, then it is obtained from `starts` and `ends`.
+
+    Returns:
+      :obj:`Graph` - a new graph of the class it is called for.
+    """
+    # NumPy arrays are converted to python ints in bulk.
+    if hasattr(starts, 'dtype'):
+      starts = starts.tolist()
+    if hasattr(ends, 'dtype'):
+      ends = ends.tolist()
+
+    return cls(edges=zip(starts, ends), vertices_num=vertices_num)
+
+
+  def _grow(self, vertices_num):
+    """ Adds vertices with no edges to make their number `vertices_num`. """
+    if vertices_num > self.vertices_num:
+      self.edges.extend([] for _ in range(vertices_num - self.vertices_num))
+      self.vertices_num = vertices_num
+
+
+  def _read_edges(self, edges, reverse=False):
+    """ 
+    Adds edges from an iterable of pairs (start, end) in a single pass 
+    updating the number of vertices and the maximum degree. If `reverse` is
+    set the reverse halves (end, start) of the edges are collected by vertices
+    and returned, so that they could be added after all the edges. Otherwise
+    returns None.
+    """
+    incidences = self.edges
+    max_degree = self.max_degree
+    halves = [ [] for _ in self.get_vertices() ] if reverse else None
+
+    for start, end in edges:
+
+      if start >= self.vertices_num or end >= self.vertices_num:
+        self._grow(max(start, end) + 1)
+
+        if reverse:
+          halves.extend([] for _ in range(self.vertices_num - len(halves)))
+
+      incidence = incidences[start]
+      incidence.append(end)
+
+      if len(incidence) > max_degree:
+        max_degree = len(incidence)
+
+      if reverse:
+        halves[end].append(start)
     
-    # Set maximum degree of vertices in the graph
-    self.max_degree = 0
-    self.update_max_degree()
+    self.max_degree = max_degree
+    return halves
 
 
   def __eq__(self, other):
@@ -119,6 +201,22 @@ class Graph:
     self.edges[start].remove(end)
 
 
+  def remove_edge_at(self, start, index):
+    """ Remove an edge given by its handle - the vertex `start` and the 
+    position `index` of the edge in the incidence of `start`. The last edge of 
+    the incidence takes the place of the removed one, so the removal takes O(1)
+    time. Returns the end of the removed edge. """
+    incidence = self.edges[start]
+    index %= len(incidence)
+    end = incidence[index]
+
+    last = incidence.pop()
+    if index < len(incidence):
+      incidence[index] = last
+
+    return end
+
+
   def add_edge(self, start, end):
     """ Add an edge to a graph. It is assumed no new vertex is added and
     `max_degree` is not updated. """
@@ -132,6 +230,42 @@ class Graph:
       self.edges[start].extend(incidence)
 
 
+  def save(self, path):
+    """
+    Writes the graph to a binary file in CSR layout. The file begins with a 
+    header of the number of vertices, the number of edge positions and of 
+    edges, whether the graph is undirected and its maximum degree, followed
+    by `indptr` and `indices` of the graph as of `CSRGraph`. The incidences 
+    are written in chunks, so no copy of the graph is made.
+
+    Args:
+      path (:obj:`str`) - a path of the file.
+    """
+    _save_graph(self, path)
+
+
+  @classmethod
+  def load(cls, path, mmap=True):
+    """
+    Reads a graph written by `save`.
+
+    Args:
+      path (:obj:`str`) - a path of the file.
+
+      mmap (bool, optional) - whether to map the file into memory. Then a 
+          read-only `CSRGraph` is returned which buffers are memoryviews of 
+          the mapping. It takes O(1) time and the pages are shared by all 
+          processes that load the same file. Otherwise a list-of-lists copy
+          is returned: `UDGraph` if the graph is undirected, otherwise 
+          `Graph`. Default to True.
+
+    Returns:
+      :obj:`CSRGraph` or :obj:`Graph` - the graph loaded.
+    """
+    graph = CSRGraph.load(path, mmap=mmap)
+    return graph if mmap else graph.to_graph()
+
+
 
 class UDGraph(Graph):
   """
@@ -143,9 +277,15 @@ class UDGraph(Graph):
   Note:
       In this implementation as a list used python list that is actually an 
       array
+
+  Attributes:
+      twins (:obj:`list` of :obj:`list` of int) - a list of positions of twin 
+          edges in edge-indexed mode, otherwise None. The edge (start, end) on
+          position `i` of `edges[start]` is duplicated by the edge (end, start)
+          on position `twins[start][i]` of `edges[end]`.
   """
 
-  def __init__(self, edges=None, graph=None, vertices_num=0):
+  def __init__(self, edges=None, graph=None, vertices_num=0, indexed=False):
     """
     Create a new undirected graph object. If none of arguments are given an 
     empty graph will be created.
@@ -166,6 +306,10 @@ class UDGraph(Graph):
           created. If it is not specified it will be obtained from `edges` and 
           'graph' as a maximum of values of vertex identifiers in these 
           variables. The parameter is used to speed up. Default to 0.
+
+      indexed (bool, optional): whether to create the graph in edge-indexed 
+          mode, in which each edge knows the position of its twin and removal 
+          of an edge by its handle takes O(1) time. Default to False.
     
     Note:
       due to implementation of Graph base class for an undirected graph each 
@@ -174,31 +318,565 @@ class UDGraph(Graph):
     """
     super().__init__(edges=edges, graph=graph, vertices_num=vertices_num)
     
-    if edges:
-      for start, end in edges:
-        self.edges[end].append(start)
-    
     if graph.__class__ == Graph:
       for start, incidence in enumerate(graph.edges):
         for end in incidence:
           self.edges[end].append(start)
 
-    self.update_max_degree()
+      self.update_max_degree()
+
+    self.twins = None
+    if indexed:
+      self.index_edges()
+
+
+  def _read_edges(self, edges):
+    """ Adds edges from an iterable of pairs (start, end) in a single pass and
+    returns their reverse halves (end, start), which are added after the edges
+    and the edges of a graph given as in `Graph.__init__`, so an incidence 
+    lists the ends of edges before the starts. """
+    return super()._read_edges(edges, reverse=True)
+
+
+  def index_edges(self):
+    """ Switch the graph to edge-indexed mode by finding the twin of each edge.
+    It takes O(E) time. """
+    from collections import defaultdict
+
+    positions = defaultdict(list)
+    self.twins = [ [0] * len(incidence) for incidence in self.edges ]
+
+    for start, incidence in enumerate(self.edges):
+      for index, end in enumerate(incidence):
+
+        twin_positions = positions[end, start]
+
+        if twin_positions:
+          twin = twin_positions.pop()
+          self.twins[start][index] = twin
+          self.twins[end][twin] = index
+        
+        else:
+          positions[start, end].append(index)
 
 
   def remove_edge(self, start, end):
     """ Remove an edge from the graph. It is assumed no vertex is deleted and 
     `max_degree` is not updated. """
+    if self.twins is not None:
+      self.remove_edge_at(start, self.edges[start].index(end))
+      return
+
     self.edges[start].remove(end)
     self.edges[end].remove(start)
 
 
+  def remove_edge_at(self, start, index):
+    """ Remove an edge given by its handle - the vertex `start` and the 
+    position `index` of the edge in the incidence of `start`. In edge-indexed 
+    mode both the edge and its twin are removed in O(1) time. Returns the end 
+    of the removed edge. """
+    index %= len(self.edges[start])
+    end = self.edges[start][index]
+
+    if self.twins is None:
+      super().remove_edge_at(start, index)
+      self.edges[end].remove(start)
+      return end
+
+    twin = self.twins[start][index]
+    self.__pop_edge(start, index)
+    self.__pop_edge(end, twin)
+
+    return end
+
+
+  def __pop_edge(self, vertex, index):
+    """ Remove one edge from the incidence of `vertex` in edge-indexed mode 
+    replacing it with the last one and fixing the twin of the latter. """
+    incidence, twins = self.edges[vertex], self.twins[vertex]
+
+    last, last_twin = incidence.pop(), twins.pop()
+
+    if index < len(incidence):
+      incidence[index] = last
+      twins[index] = last_twin
+      self.twins[last][last_twin] = index
+
+
   def add_edge(self, start, end):
     """ Add an edge to a graph. It is assumed no new vertex is added and
     `max_degree` is not updated. """
     self.edges[start].append(end)
     self.edges[end].append(start)
 
+    if self.twins is not None:
+      self.twins[start].append(len(self.edges[end]) - 1)
+      self.twins[end].append(len(self.edges[start]) - 1)
+
+
+  def union(self, graph):
+    """ Returns the union of the graphs. It is assumed vertices set remains
+    unchanged. """
+    if self.twins is None:
+      super().union(graph)
+      return
+
+    if getattr(graph, 'twins', None) is None:
+      super().union(graph)
+      self.index_edges()
+      return
+
+    offsets = [ len(incidence) for incidence in self.edges ]
+
+    for start, incidence in enumerate(graph.edges):
+      self.twins[start].extend(
+          offsets[end] + twin 
+              for end, twin in zip(incidence, graph.twins[start]))
+      self.edges[start].extend(incidence)
+
+
+class CSRIncidence:
+  """
+  A read-only list of incidences of a `CSRGraph`. It behaves like the
+  `Graph.edges` list: `incidence[v]` gives the neighbors of a vertex `v`, 
+  `len(incidence)` gives the number of vertices, and iteration yields the 
+  neighbors of each vertex in turn. The neighbors are returned as memoryview 
+  slices of the graph buffer, so no copying is done.
+  """
+
+  def __init__(self, indptr, indices):
+    self._indptr = indptr
+    self._indices = memoryview(indices)
+
+
+  def __getitem__(self, vertex):
+    return self._indices[self._indptr[vertex]:self._indptr[vertex + 1]]
+
+
+  def __len__(self):
+    return len(self._indptr) - 1
+
+
+  def __iter__(self):
+    for vertex in range(len(self)):
+      yield self[vertex]
+
+
+  def __repr__(self):
+    return str([ incidence.tolist() for incidence in self ])
+
+
+
+class CSRGraph:
+  """
+  An immutable graph stored in compressed sparse row (CSR) form. The neighbors
+  of a vertex `v` are `indices[indptr[v]:indptr[v + 1]]`, so the whole graph is
+  kept in two contiguous integer buffers instead of a list of python lists. The
+  read API is the same as of `Graph`, so the algorithms that do not modify a
+  graph accept both of them.
+
+  Attributes:
+      indptr (:obj:`array` of int) - offsets of incidences in `indices`, its
+          length is `vertices_num` + 1.
+
+      indices (:obj:`array` of int) - concatenated incidences of all vertices.
+
+      edges (:obj:`CSRIncidence`) - a read-only list of incidences.
+
+      vertices_num (int) - a number of vertices
+
+      max_degree (int) - a maximum degree of vertices of a graph
+
+      undirected (bool) - whether the graph is built from an undirected graph,
+          i.e. each edge is stored twice as in `UDGraph`.
+  """
+
+  def __init__(self, graph=None, indptr=None, indices=None, undirected=False,
+               max_degree=None):
+    """
+    Create a new CSR graph either from a list-of-lists graph or from the ready
+    buffers. If none of arguments are given an empty graph will be created.
+
+    Keyword args:
+
+      graph (:obj:`Graph`, optional): a graph which edges will be copied to a 
+          new graph. If it is given `indptr` and `indices` are ignored. Default
+          to None.
+
+      indptr (buffer of int, optional): offsets of incidences, e.g. `array` or
+          NumPy array. It is used without copying. Default to None.
+
+      indices (buffer of int, optional): concatenated incidences. It is used 
+          without copying. Default to None.
+
+      undirected (bool, optional): whether each edge is stored twice. It is 
+          obtained from `graph` if the latter is given. Default to False.
+
+      max_degree (int, optional): the maximum degree if it is known, so it is
+          not counted over the vertices. Default to None.
+    """
+
+    if graph is not None:
+      undirected = getattr(graph, 'undirected', isinstance(graph, UDGraph))
+
+      indptr = array('i', [0])
+      indices = array('i')
+
+      for incidence in graph.edges:
+        indices.extend(incidence)
+        indptr.append(len(indices))
+
+    if indptr is None:
+      indptr, indices = array('i', [0]), array('i')
+
+    self.indptr = indptr
+    self.indices = indices
+    self.undirected = undirected
+    self.vertices_num = len(indptr) - 1
+    self.edges = CSRIncidence(indptr, indices)
+
+    if max_degree is None:
+      max_degree = max(
+          (indptr[v + 1] - indptr[v] for v in self.get_vertices()), default=0)
+
+    self.max_degree = max_degree
+    self.path = None
+    self._twins = None
+
+
+  def __eq__(self, other):
+    from collections import Counter
+
+    return all([ Counter(i_s) == Counter(i_o) 
+                   for i_s, i_o in zip(self.edges, other.edges)])
+
+
+  def __reduce__(self):
+    # The incidence holds a memoryview, so a graph is pickled by its buffers,
+    # e.g. to be sent to worker processes. A mapped graph is mapped again.
+    if self.path is not None:
+      return (self.__class__.load, (self.path, True))
+
+    return (self.__class__, (None, self.indptr, self.indices, self.undirected,
+                             self.max_degree))
+
+
+  def __str__(self):
+    klass_name = self.__class__.__name__.lower()
+    edges_str = ', '.join(
+        [ f'[{v}]-{inc.tolist()}' for v, inc in enumerate(self.edges) ]
+    )
+    return f'{klass_name}({edges_str})'
+
+
+  def __repr__(self):
+    return repr(self.edges)
+
+
+  def degree(self, vertex):
+    """ int -> int: Returns a degree of a given edge. """
+
+    return self.indptr[vertex + 1] - self.indptr[vertex]
+
+
+  def get_vertices(self):
+    """ () -> range: Returns vertices of the graph as a range object. """
+    return range(self.vertices_num)
+
+
+  def edge_twins(self):
+    """ 
+    Returns an array that maps each position `k` of `indices` to the position 
+    of its twin, i.e. of the edge (end, start) for the edge (start, end) on `k`.
+    It makes sense for undirected graphs only. The array is computed once in 
+    O(V + E) time by two counting sorts and is cached afterwards.
+    """
+    if self._twins is None:
+
+      starts = array('i')
+      for vertex in self.get_vertices():
+        starts.extend([vertex] * self.degree(vertex))
+
+      # Positions sorted by (end, start), then stably by start, that gives 
+      # sorted by (start, end). The edges of the same rank are twins.
+      by_end = _counting_sort(self.indices, range(len(self.indices)),
+                              self.vertices_num)
+      by_start = _counting_sort(starts, by_end, self.vertices_num)
+
+      self._twins = array('i', bytes(len(by_start) * by_start.itemsize))
+      for position, twin in zip(by_start, by_end):
+        self._twins[position] = twin
+
+    return self._twins
+
+
+  def save(self, path):
+    """ Writes the graph to a binary file, see `Graph.save`. """
+    _save_graph(self, path)
+
+
+  @classmethod
+  def load(cls, path, mmap=True):
+    """
+    Reads a graph written by `save`. If `mmap` is True the file is mapped into
+    memory read-only and `indptr` and `indices` are memoryviews of the mapping,
+    so no data is read until it is accessed and the graph keeps the mapping 
+    open. Such a graph is pickled by its path. Otherwise the buffers are read
+    into arrays. A big-endian platform always reads the buffers.
+
+    Raises:
+      ValueError: if the file is not a graph file or it is truncated.
+    """
+    with open(path, 'rb') as file:
+      header = file.read(_FILE_HEADER.size)
+
+      if len(header) < _FILE_HEADER.size:
+        raise ValueError(f'{path} is not a graph file')
+
+      magic, version, flags, vertices_num, positions_num, _, max_degree = \
+          _FILE_HEADER.unpack(header)
+
+      if magic != _FILE_MAGIC or version != _FILE_VERSION:
+        raise ValueError(f'{path} is not a graph file of version '
+                         f'{_FILE_VERSION}')
+
+      indptr_end = _FILE_HEADER.size + 8 * (vertices_num + 1)
+      indices_end = indptr_end + 4 * positions_num
+
+      if mmap and sys.byteorder == 'little':
+        mapping = memory_map(file.fileno(), 0, access=ACCESS_READ)
+
+        if len(mapping) < indices_end:
+          raise ValueError(f'{path} is truncated')
+
+        view = memoryview(mapping)
+        indptr = view[_FILE_HEADER.size:indptr_end].cast('q')
+        indices = view[indptr_end:indices_end].cast('i')
+
+      else:
+        indptr, indices = array('q'), array('i')
+
+        try:
+          indptr.fromfile(file, vertices_num + 1)
+          indices.fromfile(file, positions_num)
+        except EOFError:
+          raise ValueError(f'{path} is truncated') from None
+
+        if sys.byteorder == 'big':
+          indptr.byteswap()
+          indices.byteswap()
+
+    graph = cls(indptr=indptr, indices=indices, 
+                undirected=bool(flags & _FILE_UNDIRECTED), 
+                max_degree=max_degree)
+
+    if mmap and isinstance(indices, memoryview):
+      graph.path = path
+
+    return graph
+
+
+  def to_graph(self):
+    """ Returns a list-of-lists copy of the graph: `UDGraph` if the graph is 
+    undirected, otherwise `Graph`. """
+
+    graph = (UDGraph if self.undirected else Graph)()
+    graph.vertices_num = self.vertices_num
+    graph.edges = [ incidence.tolist() for incidence in self.edges ]
+    graph.update_max_degree()
+
+    return graph
+
+
+
+class CutIncidence:
+  """
+  A read-only list of incidences of a `CutGraph`. `incidence[v]` gives the 
+  neighbors of a vertex `v` colored differently from `v`. They are filtered
+  from the incidence of the underlying graph on each access.
+  """
+
+  def __init__(self, edges, coloring):
+    self._edges = edges
+    self._coloring = coloring
+
+
+  def __getitem__(self, vertex):
+    color = self._coloring[vertex]
+    return [ end for end in self._edges[vertex] 
+                 if self._coloring[end] != color ]
+
+
+  def __len__(self):
+    return len(self._edges)
+
+
+  def __iter__(self):
+    for vertex in range(len(self)):
+      yield self[vertex]
+
+
+  def __repr__(self):
+    return str(list(self))
+
+
+
+class CutGraph:
+  """
+  A lazy read-only view of a subgraph of a graph formed by the edges that 
+  connect vertices of different colors, i.e. a spanning bipartite subgraph 
+  given by a binary vertex coloring. The view shares the adjacency of the 
+  underlying graph, so it takes O(1) memory to create, and the incidence of a
+  vertex is filtered in O(deg) time on access. The read API is the same as of
+  `Graph`.
+
+  Attributes:
+      graph (:obj:`Graph`) - the underlying graph.
+
+      coloring (:obj:`tuple` of int) - a color of each vertex.
+
+      edges (:obj:`CutIncidence`) - a read-only list of incidences.
+
+      vertices_num (int) - a number of vertices
+
+      undirected (bool) - whether the underlying graph is undirected.
+  """
+
+  def __init__(self, graph, coloring):
+    self.graph = graph
+    self.coloring = coloring
+    self.vertices_num = graph.vertices_num
+    self.undirected = getattr(graph, 'undirected', isinstance(graph, UDGraph))
+    self.edges = CutIncidence(graph.edges, coloring)
+    self._max_degree = None
+
+
+  def __str__(self):
+    klass_name = self.__class__.__name__.lower()
+    edges_str = ', '.join(
+        [ f'[{v}]-{inc}' for v, inc in enumerate(self.edges) ]
+    )
+    return f'{klass_name}({edges_str})'
+
+
+  def __repr__(self):
+    return repr(self.edges)
+
+
+  @property
+  def max_degree(self):
+    """ int: a maximum degree of vertices, it is counted on the first access.
+    """
+    if self._max_degree is None:
+      self._max_degree = max(
+          (self.degree(v) for v in self.get_vertices()), default=0)
+    
+    return self._max_degree
+
+
+  def degree(self, vertex):
+    """ int -> int: Returns a degree of a given edge. """
+    return len(self.edges[vertex])
+
+
+  def get_vertices(self):
+    """ () -> range: Returns vertices of the graph as a range object. """
+    return range(self.vertices_num)
+
+
+  def to_graph(self, permutation=None):
+    """ 
+    Returns a list-of-lists copy of the subgraph: `UDGraph` if the graph is
+    undirected, otherwise `Graph`. If `permutation` is given the vertex `v` 
+    becomes the vertex `permutation[v]` in the copy.
+    """
+    graph = (UDGraph if self.undirected else Graph)()
+    graph.vertices_num = self.vertices_num
+
+    if permutation is None:
+      graph.edges = list(self.edges)
+    
+    else:
+      graph.edges = [ None ] * self.vertices_num
+
+      for vertex, incidence in enumerate(self.edges):
+        graph.edges[permutation[vertex]] = [ permutation[end] 
+                                             for end in incidence ]
+
+    graph.update_max_degree()
+
+    return graph
+
+
+
+def _save_graph(graph, path):
+  """ Writes any graph to a binary file, see `Graph.save`. """
+  undirected = getattr(graph, 'undirected', isinstance(graph, UDGraph))
+
+  indptr = array('q', [0])
+  positions_num = max_degree = 0
+
+  for incidence in graph.edges:
+    positions_num += len(incidence)
+    max_degree = max(max_degree, len(incidence))
+    indptr.append(positions_num)
+
+  edges_num = positions_num // 2 if undirected else positions_num
+  flags = _FILE_UNDIRECTED if undirected else 0
+
+  with open(path, 'wb') as file:
+    file.write(_FILE_HEADER.pack(_FILE_MAGIC, _FILE_VERSION, flags, 
+                                 graph.vertices_num, positions_num, edges_num,
+                                 max_degree))
+    _write_ints(file, indptr)
+
+    indices = getattr(graph, 'indices', None)
+
+    if indices is not None and memoryview(indices).format == 'i':
+      _write_ints(file, indices)
+      return
+    
+    chunk = array('i')
+
+    for incidence in graph.edges:
+      chunk.extend(incidence)
+
+      if len(chunk) >= _FILE_CHUNK:
+        _write_ints(file, chunk)
+        chunk = array('i')
+    
+    _write_ints(file, chunk)
+
+
+def _write_ints(file, ints):
+  """ Writes a buffer of ints in little-endian byte order. """
+  if sys.byteorder == 'big':
+    ints = array(memoryview(ints).format, ints)
+    ints.byteswap()
+
+  file.write(ints)
+
+
+def _counting_sort(keys, items, keys_num):
+  """ Stable sort of `items` by `keys[item]` that are in range(keys_num). """
+  counts = array('i', bytes((keys_num + 1) * array('i').itemsize))
+
+  for item in items:
+    counts[keys[item] + 1] += 1
+
+  for key in range(keys_num):
+    counts[key + 1] += counts[key]
+
+  result = array('i', bytes(len(items) * counts.itemsize))
+
+  for item in items:
+    key = keys[item]
+    result[counts[key]] = item
+    counts[key] += 1
+
+  return result
+
 
 if __name__ == '__main__':
   udgraph = UDGraph(edges=[ (0, 1), (0, 3), (1, 2), (2, 0), (2, 3) ])
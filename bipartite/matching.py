@@ -3,8 +3,12 @@ Created by Ivanov Roman and Maxim Dudin.
 
 https://github.com/severmore/pygraphs
 """
+from array import array
 from collections import deque
 
+import bipartite.graph
+import bipartite.tools
+
 def euler_partition(graph, sustain_graph=False):
   """ 
   Finds an Euler partition of a graph. An Euler partition is a partition of
@@ -18,12 +22,17 @@ def euler_partition(graph, sustain_graph=False):
   should be considered.
 
   After finishing this method all edges of an initial graph will be removed as 
-  the algorithm supposes. To avoid this set `sustain_graph` to True.
+  the algorithm supposes. To avoid this set `sustain_graph` to True, then the
+  edges are marked as used instead of removal and the graph is left untouched.
+  A `CSRGraph` is immutable, so it is always traversed in this way.
+
+  An undirected graph is switched to edge-indexed mode, so each edge is removed
+  or marked in O(1) time and the whole partition takes O(E) time.
   
   Args:
     graph(:obj:`Graph`) - a graph for which a partition is to find.
 
-    sustain_graph(bool) - if it is set to True graph edges will be copied.
+    sustain_graph(bool) - if it is set to True graph edges will be kept.
   
   Return:
     :obj:`list` of :obj:`list` of int: an Euler partition representation that 
@@ -35,8 +44,11 @@ def euler_partition(graph, sustain_graph=False):
     Multigraphs // The International Journal of Computer and Information 
     Sciences, Vol. 5, No. 4, 1976.
   """
-  if sustain_graph:
-    pass
+  if sustain_graph or isinstance(graph, bipartite.graph.CSRGraph):
+    return _sustained_euler_partition(graph)
+
+  if isinstance(graph, bipartite.graph.UDGraph) and graph.twins is None:
+    graph.index_edges()
 
   partition = list()
 
@@ -59,9 +71,8 @@ def euler_partition(graph, sustain_graph=False):
 
       while graph.degree(pivot):
 
-        pivot_next = graph.edges[pivot][0]
-
-        graph.remove_edge(pivot, pivot_next)
+        # The last edge of the incidence is taken as its removal is the cheapest
+        pivot_next = graph.remove_edge_at(pivot, -1)
         path.append(pivot_next)
 
         pivot = pivot_next
@@ -74,18 +85,106 @@ def euler_partition(graph, sustain_graph=False):
   return partition
 
 
-def euler_split(graph):
+def _sustained_euler_partition(graph):
+  """ 
+  Finds an Euler partition of a graph as `euler_partition` does, but leaves 
+  the edges of the graph untouched. Each vertex has a cursor to the first 
+  edge of its incidence that may be not used yet, and used edges are marked in
+  a bit set indexed by edge positions in a CSR layout of the graph, so the 
+  scratch space is E bits besides O(V) cursors and degrees.
+
+  The twin of each edge of an undirected graph is taken from the edge index. 
+  A `UDGraph` is switched to edge-indexed mode once as in `euler_partition`,
+  so the next partitions of the graph reuse its index, and the order of its 
+  incidences is kept.
+  """
+  if isinstance(graph, bipartite.graph.UDGraph) and graph.twins is None:
+    graph.index_edges()
+
+  is_csr = isinstance(graph, bipartite.graph.CSRGraph)
+
+  if is_csr:
+    offsets, ends = graph.indptr, graph.indices
+    twins = graph.edge_twins() if graph.undirected else None
+  
+  else:
+    offsets = array('i', [0])
+    for incidence in graph.edges:
+      offsets.append(offsets[-1] + len(incidence))
+
+    twins = getattr(graph, 'twins', None)
+
+  used = bytearray((offsets[-1] >> 3) + 1)
+  cursor = array('i', offsets[:-1])
+  degree = array('i', [ graph.degree(v) for v in graph.get_vertices() ])
+
+  partition = list()
+  queue = deque()
+  
+  for vertex in graph.get_vertices():
+    if degree[vertex] % 2:
+      queue.append(vertex)
+    else:
+      queue.appendleft(vertex)
+
+  while queue:
+    start = queue.pop()
+
+    if degree[start]:
+
+      path = [start]
+      pivot = start
+
+      while degree[pivot]:
+
+        position = cursor[pivot]
+        while used[position >> 3] >> (position & 7) & 1:
+          position += 1
+        cursor[pivot] = position + 1
+
+        used[position >> 3] |= 1 << (position & 7)
+        degree[pivot] -= 1
+
+        if is_csr:
+          pivot_next = ends[position]
+          twin = twins[position] if twins else None
+        
+        else:
+          index = position - offsets[pivot]
+          pivot_next = graph.edges[pivot][index]
+          twin = offsets[pivot_next] + twins[pivot][index] if twins else None
+
+        if twin is not None:
+          used[twin >> 3] |= 1 << (twin & 7)
+          degree[pivot_next] -= 1
+
+        path.append(pivot_next)
+        pivot = pivot_next
+
+      partition.append(path)
+
+      if degree[start]:
+        queue.appendleft(start)
+
+  return partition
+
+
+def euler_split(graph, sustain_graph=False):
   """
   Returns an Euler split of a graph. An Euler split is two subgraphs of the
   initial graph such that the set of both subgraphs vertices remains unchanged,
   the edges of the graph is a disjoint union of subgraphs edges and these 
   obtains by alteranatively placing the edges of the paths in the Euler 
-  partition of the graph to the subgraphs.
+  partition of the graph to the subgraphs. The split takes O(E) time as the
+  partition is found in edge-indexed mode.
 
   Args:
     graph(:obj:`Graph`) - a graph for which a matching covering maximum degree
         vertices is need to find.
 
+    sustain_graph(bool) - if it is set to True graph edges will be kept, 
+        otherwise they are removed. See `euler_partition`.
+
   Returns:
     :obj:`list` of :obj:`turple` of int - a matching to find as a list of edges.
   
@@ -95,10 +194,21 @@ def euler_split(graph):
     Sciences, Vol. 5, No. 4, 1976.
   """
 
-  G1 = graph.__class__(vertices_num=graph.vertices_num)
-  G2 = graph.__class__(vertices_num=graph.vertices_num)
+  klass = graph.__class__
+  
+  if isinstance(graph, bipartite.graph.CSRGraph):
+    klass = bipartite.graph.UDGraph if graph.undirected else \
+            bipartite.graph.Graph
+
+  G1 = klass(vertices_num=graph.vertices_num)
+  G2 = klass(vertices_num=graph.vertices_num)
+
+  partition = euler_partition(graph, sustain_graph)
 
-  partition = euler_partition(graph)
+  # Subgraphs inherit edge-indexed mode, so splitting them is linear as well
+  if issubclass(klass, bipartite.graph.UDGraph):
+    G1.index_edges()
+    G2.index_edges()
 
   for path in partition:
     v_prev, path = path[0], path[1:]
@@ -118,6 +228,346 @@ def euler_split(graph):
   return G1, G2
 
 
+class EulerSplitter:
+  """
+  Performs Euler splits of edge lists in place using the scratch space 
+  allocated once, so that a sequence of splits does not allocate memory per
+  subgraph. Edges are stored in two arrays `starts` and `ends`, a subgraph is a
+  range of positions in these arrays, and a split reorders its range so that 
+  the edges of both subgraphs become adjacent ranges.
+
+  The incidence of a subgraph is kept as linked lists over its positions: 
+  `head[v]` is the first half-edge of a vertex `v`, and `link[h]` is the next 
+  one. The half-edges of the edge on position `p` are `2 * p` (at the start) 
+  and `2 * p + 1` (at the end).
+
+  Attributes:
+    starts(:obj:`array` of int) - starts of edges.
+
+    ends(:obj:`array` of int) - ends of edges.
+
+    ids(:obj:`array` of int) - identifiers of edges, if any, that are moved 
+        together with the edges.
+
+    sides(:obj:`bytearray`) - the subgraph each position is placed to by the
+        last split.
+
+    work(:obj:`array` of int) - positions of a weighted subgraph halved in 
+        place by `keep_half`.
+
+    weights(:obj:`array` of int) - weights of edges of this subgraph by their
+        positions.
+  """
+
+  def __init__(self, starts, ends, vertices_num, edges_num, ids=None):
+    """
+    Args:
+      starts(:obj:`array` of int), ends(:obj:`array` of int) - edges to split. 
+          Positions from `edges_num` up to `edges_num + vertices_num` are 
+          reserved for auxiliary edges of `cover` method.
+
+      vertices_num(int) - a number of vertices of a graph.
+
+      edges_num(int) - a number of edges of a graph.
+
+      ids(:obj:`array` of int, optional) - identifiers of edges to keep track
+          of the edges while they are reordered. Default to None.
+    """
+    self.starts = starts
+    self.ends = ends
+    self.ids = ids
+    self.vertices_num = vertices_num
+    self.edges_num = edges_num
+
+    # The graph is extended by auxiliary vertices and edges in `cover`.
+    vertices_cap = 2 * vertices_num
+    edges_cap = edges_num + vertices_num
+
+    self.head = array('i', [-1]) * vertices_cap
+    self.degree = array('i', [0]) * vertices_cap
+    self.link = array('i', [0]) * (2 * edges_cap)
+    self.used = bytearray(edges_cap)
+    self.sides = bytearray(edges_cap)
+    self.touched = array('i', [0]) * vertices_cap
+    self.odd = array('i', [0]) * edges_cap
+    self.work = array('i', [0]) * edges_cap
+    self.weights = array('i', [0]) * edges_cap
+
+
+  def split(self, lo, hi):
+    """ 
+    Splits the subgraph on positions from `lo` to `hi` into two subgraphs 
+    by Euler partition. Returns a position `mid` such that the subgraphs are
+    the ranges `lo`-`mid` and `mid`-`hi`.
+    """
+    self._assign_sides(range(lo, hi))
+    return self._move_front(lo, hi, 0)
+
+
+  def cover(self, lo, hi, max_degree):
+    """
+    Finds a matching of the subgraph on positions from `lo` to `hi` covering 
+    all its vertices of degree `max_degree`, and moves it to the front of the
+    range. Returns a position `mid` such that the matching is the range 
+    `lo`-`mid`.
+
+    Each edge gets a weight `alpha` and each vertex of degree `max_degree` gets 
+    an auxiliary pendant edge of weight `beta`, so that these vertices have the 
+    weighted degree `2 ** t`, and the others have less. Each of `t` Euler 
+    splits halves the weights and keeps the half with less auxiliary weight. As
+    the total auxiliary weight is less than `2 ** t`, the result is a matching
+    of the subgraph edges covering the maximum degree vertices [3].
+
+    References:
+      [3] Noga Alon. A Simple Algorithm for Edge-Coloring Bipartite 
+      Multigraphs // Information Processing Letters, Vol. 85, No. 6, 
+      pp. 301-302, 2003.
+    """
+    starts, ends, degree = self.starts, self.ends, self.degree
+    touched, work, weights = self.touched, self.work, self.weights
+
+    touched_num = 0
+    for position in range(lo, hi):
+      for vertex in starts[position], ends[position]:
+        if not degree[vertex]:
+          touched[touched_num] = vertex
+          touched_num += 1
+        degree[vertex] += 1
+
+    covered_num = sum(1 for index in range(touched_num) 
+                        if degree[touched[index]] == max_degree)
+
+    power = 1
+    while power < max_degree or power <= (max_degree - 1) * covered_num:
+      power *= 2
+
+    alpha = power // max_degree
+    beta = power - alpha * max_degree
+
+    size = 0
+    for position in range(lo, hi):
+      work[size] = position
+      weights[position] = alpha
+      size += 1
+
+    position = self.edges_num
+    for index in range(touched_num):
+      vertex = touched[index]
+
+      if beta and degree[vertex] == max_degree:
+        starts[position] = vertex
+        ends[position] = self.vertices_num + position - self.edges_num
+        work[size] = position
+        weights[position] = beta
+        position += 1
+        size += 1
+      
+      degree[vertex] = 0
+
+    while power > 1:
+      size = self.keep_half(size)
+      power //= 2
+
+    sides = self.sides
+
+    for position in range(lo, hi):
+      sides[position] = 1
+
+    for index in range(size):
+      sides[work[index]] = 0
+
+    return self._move_front(lo, hi, 0)
+
+
+  def halve(self, positions, weights):
+    """
+    Splits a weighted subgraph into two halves by Euler partition. An edge of
+    weight `w` is treated as `w` parallel edges: `w // 2` of them go to each 
+    half, and the odd one goes to a half by the partition of the odd weight 
+    edges. So the weighted degree of each vertex is halved rounding up for one
+    half and down for the other, and it is halved exactly if it is even.
+
+    Args:
+      positions(:obj:`list` of int) - positions of edges of the subgraph.
+
+      weights(:obj:`list` of int) - the weights of these edges.
+
+    Returns:
+      (:obj:`list` of int, :obj:`list` of int), (:obj:`list` of int, 
+      :obj:`list` of int) - positions and weights of edges of each half, edges 
+      of zero weight are dropped.
+    """
+    odd, odd_num = self.odd, 0
+
+    for position, weight in zip(positions, weights):
+      if weight % 2:
+        odd[odd_num] = position
+        odd_num += 1
+
+    self._assign_sides(memoryview(odd)[:odd_num])
+
+    sides = self.sides
+    halves = ([], []), ([], [])
+
+    for position, weight in zip(positions, weights):
+
+      weight_one = weight // 2
+      weight_two = weight_one
+
+      if weight % 2:
+        if sides[position]:
+          weight_two += 1
+        else:
+          weight_one += 1
+
+      if weight_one:
+        halves[0][0].append(position)
+        halves[0][1].append(weight_one)
+
+      if weight_two:
+        halves[1][0].append(position)
+        halves[1][1].append(weight_two)
+
+    return halves
+
+
+  def keep_half(self, size):
+    """
+    Halves a weighted subgraph in place as `halve` does and keeps the half 
+    with less weight of auxiliary edges, i.e. of positions from `edges_num`.
+    The subgraph is given by the first `size` positions of `work` and the 
+    weights of its edges in `weights`, both are updated to the half kept with
+    edges of zero weight dropped. So a sequence of halvings allocates nothing.
+
+    Returns:
+      int - the number of positions of the half kept.
+    """
+    work, weights, sides, odd = self.work, self.weights, self.sides, self.odd
+    edges_num = self.edges_num
+    odd_num = 0
+
+    for index in range(size):
+      position = work[index]
+
+      if weights[position] % 2:
+        odd[odd_num] = position
+        odd_num += 1
+
+    self._assign_sides(memoryview(odd)[:odd_num])
+
+    # Auxiliary weights of the halves, the odd unit of an edge goes to the 
+    # half of its side
+    auxiliary = [0, 0]
+
+    for index in range(size):
+      position = work[index]
+
+      if position >= edges_num:
+        weight = weights[position]
+        auxiliary[0] += weight // 2
+        auxiliary[1] += weight // 2
+
+        if weight % 2:
+          auxiliary[sides[position]] += 1
+
+    side = 1 if auxiliary[1] < auxiliary[0] else 0
+    kept = 0
+
+    for index in range(size):
+      position = work[index]
+      weight = weights[position]
+      weight = weight // 2 + (weight % 2 and sides[position] == side)
+
+      if weight:
+        weights[position] = weight
+        work[kept] = position
+        kept += 1
+
+    return kept
+
+
+  def _assign_sides(self, positions):
+    """ 
+    Finds an Euler partition of edges on `positions` and alternatively assigns
+    side 0 and 1 to the edges of each path. Paths start at odd degree vertices
+    first, so that each vertex of even degree gets the same number of edges of 
+    each side, and of odd degree - at most one more of one of them.
+    """
+    starts, ends, touched = self.starts, self.ends, self.touched
+    head, link, degree, used, sides = \
+        self.head, self.link, self.degree, self.used, self.sides
+
+    touched_num = 0
+
+    for position in positions:
+      half = 2 * position
+      
+      for vertex in starts[position], ends[position]:
+        if not degree[vertex]:
+          touched[touched_num] = vertex
+          touched_num += 1
+
+        link[half] = head[vertex]
+        head[vertex] = half
+        degree[vertex] += 1
+        half += 1
+
+    # The paths from odd degree vertices come first, the degree of an even 
+    # degree vertex stays even while they are found
+    for odd_only in True, False:
+      for index in range(touched_num):
+        start = touched[index]
+
+        while degree[start] and (degree[start] % 2 or not odd_only):
+
+          pivot, side = start, 0
+
+          while degree[pivot]:
+            half = head[pivot]
+            while used[half >> 1]:
+              half = link[half]
+            
+            head[pivot] = link[half]
+            position = half >> 1
+
+            used[position] = 1
+            sides[position] = side
+            side ^= 1
+
+            degree[pivot] -= 1
+            pivot = starts[position] if half & 1 else ends[position]
+            degree[pivot] -= 1
+
+    for index in range(touched_num):
+      head[touched[index]] = -1
+
+    for position in positions:
+      used[position] = 0
+
+
+  def _move_front(self, lo, hi, side):
+    """ Reorders positions from `lo` to `hi` so that the edges of `side` come 
+    first. Returns the position of the first edge of the other side. """
+    starts, ends, sides = self.starts, self.ends, self.sides
+
+    hi -= 1
+    while True:
+      while lo <= hi and sides[lo] == side:
+        lo += 1
+      while lo <= hi and sides[hi] != side:
+        hi -= 1
+
+      if lo >= hi:
+        return lo
+
+      starts[lo], starts[hi] = starts[hi], starts[lo]
+      ends[lo], ends[hi] = ends[hi], ends[lo]
+      sides[lo], sides[hi] = sides[hi], sides[lo]
+
+      if self.ids is not None:
+        self.ids[lo], self.ids[hi] = self.ids[hi], self.ids[lo]
+
+
 def _covering_partition(graph):
   """ 
   Finds Cole-Hopcroft graph partition - a partition into two subgraphs such that
@@ -264,6 +714,187 @@ def covering_matching(graph, sustain_graph=True):
     return matching
 
 
+def maximum_matching(graph, parts=None, left_num=None, mate=None):
+  """
+  Finds a maximum cardinality matching of a bipartite graph by Hopcroft-Karp
+  algorithm in O(E * sqrt(V)) time. Each phase finds the shortest augmenting
+  path length by a breadth-first search from free vertices of the left part 
+  and then augments the matching along a maximal set of vertex disjoint 
+  shortest paths found by an iterative depth-first search.
+
+  The left part of a graph is given by `parts` or `left_num`. If neither is 
+  given it is found by a breadth-first search for an undirected graph and
+  consists of vertices having outgoing edges for a directed graph, i.e. edges
+  of a directed `Graph` are assumed to go from the left part to the right one.
+
+  Args:
+    graph(:obj:`Graph`) - a bipartite `Graph`, `UDGraph` or `CSRGraph`.
+
+    parts(:obj:`list` of int, optional) - a part (0 or 1) of each vertex, the
+        vertices of the part 0 form the left part. Default to None.
+
+    left_num(int, optional) - the number of the first vertices forming the left
+        part as in a graph produced by `SpanningBGraph.reindex`. Default to
+        None.
+
+    mate(:obj:`list` of int, optional) - a partial matching to start with as
+        returned by this function. Default to None, then the search starts from
+        a greedy matching.
+
+  Returns:
+    :obj:`array` of int - a mate of each vertex in the matching found or -1 
+        if a vertex is unmatched.
+    
+    None - if a graph is not bipartite.
+
+  Raises:
+    ValueError: if `mate` is not a matching of the graph, i.e. its length is 
+        not the number of vertices, a vertex is out of range or not matched 
+        back, or a pair is not an edge from the left part to the right one.
+
+  References:
+    [4] John E. Hopcroft, and Richard M. Karp. An n^5/2 Algorithm for Maximum
+    Matchings in Bipartite Graphs // SIAM Journal on Computing, Vol. 2, No. 4,
+    pp. 225-231, 1973.
+  """
+  vertices_num = graph.vertices_num
+  edges = graph.edges
+
+  if left_num is not None:
+    left = range(left_num)
+  
+  elif parts is not None:
+    left = [ v for v in graph.get_vertices() if not parts[v] ]
+
+  elif isinstance(graph, bipartite.graph.UDGraph) or \
+       getattr(graph, 'undirected', False):
+    parts = bipartite.tools.bipartition(graph)
+    
+    if parts is None:
+      return None
+
+    left = [ v for v in graph.get_vertices() if not parts[v] ]
+
+  else:
+    left = [ v for v in graph.get_vertices() if edges[v] ]
+
+  if mate is None:
+    mate = array('i', [-1]) * vertices_num
+
+    for u in left:
+      for v in edges[u]:
+        if mate[v] < 0:
+          mate[u], mate[v] = v, u
+          break
+  
+  else:
+    mate = array('i', mate)
+
+    if len(mate) != vertices_num:
+      raise ValueError(f'mate has {len(mate)} vertices instead of '
+                       f'{vertices_num}')
+
+    is_left = bytearray(vertices_num)
+    for u in left:
+      is_left[u] = 1
+
+    for v, m in enumerate(mate):
+      if m < 0:
+        continue
+
+      if m >= vertices_num or mate[m] != v:
+        raise ValueError(f'({v}, {m}) of mate is not matched back')
+
+      if is_left[v] == is_left[m] or is_left[v] and m not in edges[v]:
+        raise ValueError(f'({v}, {m}) of mate is not an edge between parts')
+
+  unreached = vertices_num
+  layer = array('i', [unreached]) * vertices_num
+  cursor = array('i', [0]) * vertices_num
+
+  while True:
+
+    # Breadth-first search layers left vertices by the length of the shortest
+    # alternating path from a free left vertex, and stops after the first layer
+    # reaching a free right vertex.
+
+    queue = [ u for u in left if mate[u] < 0 ]
+
+    for u in left:
+      layer[u] = unreached
+    for u in queue:
+      layer[u] = 0
+    
+    limit, head = unreached, 0
+
+    while head < len(queue):
+      u = queue[head]
+      head += 1
+      
+      if layer[u] >= limit:
+        break
+
+      for v in edges[u]:
+        w = mate[v]
+
+        if w < 0:
+          limit = layer[u] + 1
+
+        elif layer[w] == unreached:
+          layer[w] = layer[u] + 1
+          queue.append(w)
+    
+    if limit == unreached:
+      return mate
+
+    # Depth-first search augments along vertex disjoint shortest paths. Dead 
+    # end vertices are removed from layers.
+
+    for u in left:
+      cursor[u] = 0
+
+    for root in left:
+      if mate[root] >= 0:
+        continue
+
+      path, via = [root], []
+
+      while path:
+        u = path[-1]
+        incidence = edges[u]
+        advanced = False
+
+        while cursor[u] < len(incidence):
+          v = incidence[cursor[u]]
+          cursor[u] += 1
+          w = mate[v]
+
+          if w < 0 and layer[u] + 1 == limit:
+            via.append(v)
+
+            for u, v in zip(path, via):
+              mate[u], mate[v] = v, u
+
+            path = None
+            break
+          
+          if w >= 0 and layer[w] == layer[u] + 1 and layer[w] < limit:
+            path.append(w)
+            via.append(v)
+            advanced = True
+            break
+        
+        if path is None:
+          break
+
+        if not advanced:
+          layer[u] = unreached
+          path.pop()
+
+          if via:
+            via.pop()
+
+
 if __name__ == '__main__':
 
   import bipartite.graph
@@ -282,4 +913,4 @@ if __name__ == '__main__':
 
   print('restored: ', rest)
   print('equality of rest and graph: ', rest == graph)
-  
+  print('maximum matching: ', maximum_matching(graph))
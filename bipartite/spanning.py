@@ -1,6 +1,14 @@
-from collections import deque, Iterable
+import concurrent.futures
+import math
+import mmap
+import random
+import tempfile
+import time
+from array import array
+from collections.abc import Iterable
 
 import bipartite.graph
+import bipartite.tools
 
 class SpanningBGraph:
   """ A functor class that finds a spanning bipartite subgraph. """
@@ -8,7 +16,27 @@ class SpanningBGraph:
   METRICS_MAX  = 1000
   METRICS_NONE = 1111
 
-  def __init__(self, graph):
+
+  class __Node:
+    """ 
+    A container of a coloring as a bytearray of colors of vertices with 
+    cut-degrees of vertices, i.e. degrees of vertices in the bipartite subgraph
+    given by the coloring, a histogram of the cut-degrees, their sum and 
+    maximum.
+    """
+
+    __slots__ = ('colors', 'degrees', 'histogram', 'degree_sum', 
+                 'degree_max')
+
+    def __init__(self, colors, vertices_num, max_degree):
+      self.colors = colors
+      self.degrees = array('i', [0]) * vertices_num
+      self.histogram = array('i', [0]) * (max_degree + 1)
+      self.degree_sum = 0
+      self.degree_max = 0
+
+
+  def __init__(self, graph, spill_dir=None):
     """ 
     Initialize a class by a graph where to find a spanning bipartite subgraph is
     required.
@@ -16,21 +44,34 @@ class SpanningBGraph:
     Agrs:
       graph(:obj:`UDGraph`) - an undirected graph for which a spanning bipartite
           is to find.
+
+      spill_dir(str, optional) - a directory for a temporary file backing the
+          compact set of visited colorings, so that the OS could page it out.
+          Default to None, then the set is kept in a `bytearray`.
     
     Note:
       Here belonging to different parts of a bipartite graph reffered to as 
       coloring. Giving an initial graph it is sufficient only to store vertex
-      coloring.
+      coloring. While searching a visited coloring is encoded as int which bit
+      `v` is the color of vertex `v`, while a coloring being evaluated is kept
+      as a bytearray, so a vertex color is inverted in O(1).
     """
     self.graph = graph
-    self._visited = dict() # a mapping storing pairs coloring - distance
+    # a compact set of visited colorings encoded as int, the first layer of 
+    # V colorings fits it without growing
+    self._visited = _StateSet((graph.vertices_num + 7) // 8, 
+                              4 * graph.vertices_num, spill_dir)
     self._optimum = list()
+    self._trajectory = list()
+    self._engine = None # the engine of the last search
     self._min_metrics = SpanningBGraph.METRICS_MAX
     self._min_coloring = None
     self._bgraph = None
   
 
-  def __call__(self, init_coloring, max_distance, metrics='regular'):
+  def __call__(self, init_coloring, max_distance, metrics='regular', 
+               workers=None, engine='bfs', iterations=None, time_limit=None,
+               temperature=(1., 1e-3), seed=None):
     """
     Finds a spanning bipartite subgraph of the given graph. To distinguish 
     multiple subgraphs the algorithm uses a metrics. It also start with an
@@ -54,11 +95,35 @@ class SpanningBGraph:
         
       metrics (str) - a metrics regarding which the algorihtm finds a spanning
           bipartite subgraph. Default to 'regular'.
+      
+      workers (int, optional) - the number of processes expanding each distance
+          layer in parallel. Default to None, then the search is serial.
+
+      engine (str) - 'bfs' to traverse the metagraph exhaustively or 'anneal'
+          to perform simulated annealing, see `__anneal`. Default to 'bfs'.
+
+      iterations (int, optional) - the maximum number of flips tried by the 
+          'anneal' engine. Default to None, then it is 100 * V unless 
+          `time_limit` is given.
+      
+      time_limit (float, optional) - the maximum time in seconds the 'anneal'
+          engine runs for. Default to None.
+      
+      temperature (float, float) - initial and final temperatures of the
+          'anneal' engine, both are positive. Default to (1., 1e-3).
+      
+      seed (int, optional) - a seed of random number generator of the 'anneal'
+          engine. Default to None.
     
     Returns:
-      :obj:list of :obj:list of int, float - a list of pairs coloring - min
-          metrics. The index of the list is a distance on which this minimal 
-          coloring is found.
+      :obj:`UDGraph` - a spanning bipartite graph of the minimum metrics found,
+          see `make_bgraph`. The 'bfs' engine stores a list of pairs coloring -
+          min metrics at `_optimum` which index is a distance on which this 
+          minimal coloring is found. The 'anneal' engine stores only the 
+          endpoints of its walk there - the initial and the best coloring, 
+          which are not on distances 0 and 1, so they can not be taken by 
+          distance. Both store a list of triples iteration - time - the best
+          metrics found by then at `_trajectory`.
     
     Note:
       For now different `metrics` is not supported and the only choice is
@@ -71,72 +136,262 @@ class SpanningBGraph:
       
       if is_valid_coloring and max_distance >= 0:
         
-        self.__find(init_coloring, max_distance)
+        if engine == 'bfs':
+          self._engine = engine
+          self.__find(init_coloring, max_distance, workers)
+        
+        elif engine == 'anneal':
+          if min(temperature) <= 0:
+            return
+
+          self._engine = engine
+          self.__anneal(init_coloring, max_distance, iterations, time_limit, 
+                        temperature, seed)
+        
+        else:
+          return
+
         return self.make_bgraph()
     
     return
 
   
-  def __find(self, init_coloring, max_distance):
+  def __find(self, init_coloring, max_distance, workers=None):
     """ 
     Finds an optimal spanning bipartite graph regarding to metrics that
     evaluates how much a subgraph differs from a regular one.
+
+    The search expands colorings layer by layer, a layer is a list of expanded
+    colorings with arrays of vertices inverted to get their children. If 
+    `workers` is given each layer is split into shards expanded by a process
+    pool, and the shards are merged in order, so the result is identical to 
+    the serial one.
     """
+    visited = self._visited
 
-    init_metrics = self.__evaluate_metrics(init_coloring)
+    init_code = self.__encode(init_coloring)
+    root = self.__make_node(init_code)
+    init_metrics = self.__metrics(root.degree_max, root.degree_sum)
     self._optimum = [ (init_coloring, init_metrics) ]
-    self._visited[init_coloring] = 0
+    visited.add(init_code)
 
-    distance = 0
-    min_coloring = None
+    start = time.perf_counter()
+    self._trajectory = [ (0, 0., init_metrics) ]
+
+    layer = [ (init_code, None) ]
+    pool = None
+
+    # A `CSRGraph` is sent to the workers by its buffers, or by its path if it
+    # is mapped, and its incidences are read in place
+    if workers and workers > 1:
+      pool = concurrent.futures.ProcessPoolExecutor(
+          max_workers=workers, initializer=_init_worker, 
+          initargs=(self.graph,))
+
+    try:
+      for distance in range(1, max_distance + 2):
+
+        if pool is None:
+          layer, min_metrics, min_code = self._expand(layer, init_code, 
+                                                      visited)
+        else:
+          layer, min_metrics, min_code = self.__expand_parallel(
+              pool, workers, layer, init_code)
+
+        if not layer:
+          break
+
+        self._optimum.append((self.__decode(min_code), min_metrics))
+        self._trajectory.append((distance, time.perf_counter() - start, 
+                                 min(min_metrics, self._trajectory[-1][2])))
+    
+    finally:
+      if pool is not None:
+        pool.shutdown()
+    
+    return
+
+
+  def _expand(self, layer, init_code, visited):
+    """ 
+    Expands colorings of a layer and returns the next layer with the minimum
+    metrics on it and its coloring.
+
+    A coloring on distance `d` from the initial one has children on distance
+    `d - 1`, which are skipped by comparing with `init_code`, and `d + 1`, 
+    which are new unless found from other colorings of the layer as checked by
+    `visited`. Inverting a color of a vertex changes only cut-degrees of the 
+    vertex and its neighbours, so the metrics of a child coloring is evaluated
+    in O(deg(vertex)) time from cut-degrees of its parent kept in a `__Node`.
+    """
+    init_colors = self.__decode(init_code)
+    min_code = None
     min_metrics  = SpanningBGraph.METRICS_NONE
+    expanded = list()
 
-    queue = deque()
-    queue.append(init_coloring)
+    for parent, inverted in layer:
 
-    while queue:
-      
-      coloring = queue.popleft()
+      if inverted is None:
+        codes = (parent,)
+      else:
+        codes = (parent ^ (1 << vertex) for vertex in inverted)
+
+      for code in codes:
+
+        node = self.__make_node(code)
+        colors = node.colors
+        children = array('i')
+
+        for vertex in self.graph.get_vertices():
 
-      if self._visited[coloring] > distance:
+          if colors[vertex] != init_colors[vertex]:
+            continue
+          
+          child_code = code ^ (1 << vertex)
+
+          if visited.add(child_code):
+            
+            children.append(vertex)
+            child_metrics = self.__evaluate_child(node, vertex)
 
-        self._optimum.append((min_coloring, min_metrics))
+            if child_metrics < min_metrics:
+              min_metrics = child_metrics
+              min_code = child_code
         
-        min_coloring = None
-        min_metrics  = SpanningBGraph.METRICS_NONE
+        if children:
+          expanded.append((code, children))
+    
+    return expanded, min_metrics, min_code
 
-        distance += 1
-        if distance > max_distance:
-          break
+
+  def __expand_parallel(self, pool, workers, layer, init_code):
+    """ 
+    Expands a layer by a process pool. Each shard is expanded with its own set
+    of visited colorings, then children are deduplicated in shard order, and 
+    the minimum is taken from the first shard reaching it.
+    """
+    size = -(-len(layer) // (4 * workers))
+    shards = [ layer[i:i + size] for i in range(0, len(layer), size) ]
+
+    visited = self._visited
+    min_code = None
+    min_metrics  = SpanningBGraph.METRICS_NONE
+    expanded = list()
+
+    for shard, shard_metrics, shard_code in pool.map(
+        _expand_shard, [ (init_code, shard) for shard in shards ]):
+
+      if shard_metrics < min_metrics:
+        min_metrics = shard_metrics
+        min_code = shard_code
       
-      for vertex in self.graph.get_vertices():
+      for code, inverted in shard:
+        children = array('i')
+
+        for vertex in inverted:
+          child_code = code ^ (1 << vertex)
+
+          if visited.add(child_code):
+            children.append(vertex)
         
-        child_coloring = self.__invert_vertex_color(vertex, coloring)
+        if children:
+          expanded.append((code, children))
 
-        if child_coloring not in self._visited:
-          
-          queue.append(child_coloring)
-          child_metrics = self.__evaluate_metrics(child_coloring)
-          self._visited[child_coloring] = self._visited[coloring] + 1
+    return expanded, min_metrics, min_code
 
-          if child_metrics < min_metrics:
-            min_metrics = child_metrics
-            min_coloring = child_coloring
-    
-    return
+
+  def __anneal(self, init_coloring, max_distance, iterations, time_limit, 
+               temperature, seed):
+    """
+    Finds a spanning bipartite graph by simulated annealing. Each iteration 
+    tries to invert a color of a random vertex, the flip is accepted if the
+    metrics does not grow or with probability exp(-delta / t) otherwise, where
+    the temperature t decreases geometrically from the initial to the final 
+    one over the budget. Flips making the coloring differ from the initial one
+    by more than `max_distance` vertices are rejected. The metrics of a flip is
+    evaluated in O(deg(vertex)) as in `_expand`, and the coloring is kept as a
+    bytearray with its distance from the initial one, so a flip takes 
+    O(deg(vertex)) in total.
+    """
+    rng = random.Random(seed)
+    vertices_num = self.graph.vertices_num
+
+    if iterations is None and time_limit is None:
+      iterations = 100 * vertices_num
+
+    node = self.__make_node(self.__encode(init_coloring))
+    colors = node.colors
+    init_colors = best_colors = bytes(colors)
+    metrics = best_metrics = self.__metrics(node.degree_max, node.degree_sum)
+    distance = 0
+
+    t_initial, t_final = temperature
+    start = time.perf_counter()
+    progress = 0.
+    self._trajectory = [ (0, 0., best_metrics) ]
+
+    iteration = 0
+
+    while iterations is None or iteration < iterations:
+
+      if iteration % 1024 == 0 and time_limit is not None:
+        elapsed = time.perf_counter() - start
+
+        if elapsed >= time_limit:
+          break
+        
+        progress = elapsed / time_limit
       
+      if iterations is not None:
+        progress = max(progress, iteration / iterations)
+
+      iteration += 1
+      vertex = rng.randrange(vertices_num)
+      step = -1 if colors[vertex] != init_colors[vertex] else 1
+
+      if distance + step > max_distance:
+        continue
+
+      self.__invert_node(node, vertex)
+      flipped = self.__metrics(node.degree_max, node.degree_sum)
+      delta = flipped - metrics
+      t = t_initial * (t_final / t_initial) ** progress
+
+      if delta <= 0 or rng.random() < math.exp(-delta / t):
+        metrics = flipped
+        distance += step
+
+        if metrics < best_metrics:
+          best_colors, best_metrics = bytes(colors), metrics
+          self._trajectory.append((iteration, time.perf_counter() - start, 
+                                   best_metrics))
+
+      else:
+        self.__invert_node(node, vertex)
+
+    self._optimum = [ (init_coloring, self._trajectory[0][2]),
+                      (tuple(best_colors), best_metrics) ]
+
+
+  def __encode(self, coloring):
+    """ Returns int which bit `v` is set iff vertex `v` is colored by 1. """
+    return sum(1 << vertex for vertex, color in enumerate(coloring) if color)
 
-  def __invert_vertex_color(self, vertex, coloring):
-    """ Returns coloring that differs by `vertex` from the given one. """
-    vertex_inverted = 0 if coloring[vertex] else 1
-    return coloring[:vertex] + (vertex_inverted,) + coloring[vertex+1:]
+
+  def __decode(self, code):
+    """ Returns a coloring tuple encoded in int `code`. """
+    if code is None:
+      return None
+
+    return tuple((code >> vertex) & 1 for vertex in self.graph.get_vertices())
 
 
-  def __evaluate_metrics(self, coloring):
-    """ Evaluates metrics for the coloring given. """
+  def __make_node(self, code):
+    """ Evaluates cut-degrees of vertices for the coloring given. """
 
-    degree_max = 0
-    degree_sum = 0
+    coloring = bytearray(self.__decode(code))
+    node = SpanningBGraph.__Node(coloring, self.graph.vertices_num,
+                                 self.graph.max_degree)
 
     for v in self.graph.get_vertices():
       
@@ -146,13 +401,68 @@ class SpanningBGraph:
         if coloring[v] != coloring[u]:
           degree_v += 1
       
-      degree_sum += degree_v
+      node.degrees[v] = degree_v
+      node.degree_sum += degree_v
+
+      if degree_v > node.degree_max:
+        node.degree_max = degree_v
+
+    for degree in node.degrees:
+      node.histogram[degree] += 1
+
+    return node
+
+
+  def __evaluate_child(self, node, vertex):
+    """ Evaluates metrics of a child coloring of a node differing by `vertex`
+    by inverting the node to the child and back. """
+    self.__invert_node(node, vertex)
+    metrics = self.__metrics(node.degree_max, node.degree_sum)
+    self.__invert_node(node, vertex)
+
+    return metrics
+
 
-      if degree_v > degree_max:
-        degree_max = degree_v
+  def __invert_node(self, node, vertex):
+    """ Inverts a color of `vertex` in a node and updates its cut-degrees. """
+    colors, degrees, histogram = node.colors, node.degrees, node.histogram
+    degree_max = node.degree_max
+    color = colors[vertex]
+    total = 0
+
+    for u in self.graph.edges[vertex]:
+
+      if u == vertex:
+        continue
+
+      step = -1 if colors[u] != color else 1
+      total += step
+
+      degree = degrees[u]
+      histogram[degree] -= 1
+      degree += step
+      degrees[u] = degree
+      histogram[degree] += 1
+
+      if degree > degree_max:
+        degree_max = degree
+    
+    degree = degrees[vertex]
+    histogram[degree] -= 1
+    degree += total
+    degrees[vertex] = degree
+    histogram[degree] += 1
+
+    if degree > degree_max:
+      degree_max = degree
+    
+    while degree_max and not histogram[degree_max]:
+      degree_max -= 1
+    
+    colors[vertex] = 1 - color
+    node.degree_max = degree_max
+    node.degree_sum += 2 * total
 
-    return self.__metrics(degree_max, degree_sum)
-              
 
   def __metrics(self, degree_max, degree_sum):
     """ Computes metrics of a bipartite graph"""
@@ -162,11 +472,12 @@ class SpanningBGraph:
     return SpanningBGraph.METRICS_MAX
   
 
-  def make_bgraph(self, how='minimum', distance=0):
+  def make_bgraph(self, how='minimum', distance=0, lazy=False):
     """ Return a spanning bipartite graph buiodl from the given vertices 
     coloring and an initial graph via deleting unconsistent edges, i.e. edges
     that connects vertices of the same color. The mehtod is assumed a spanning
-    bgraph be found; otherwise returns None.
+    bgraph be found; otherwise returns None. It takes O(V + E) time as edges
+    of the initial graph are filtered.
     
     Args:
       how (str) - takes to value - 'minimum' and 'distance'. If 'minimum' is 
@@ -177,15 +488,21 @@ class SpanningBGraph:
       
       distance (int) - specifies how much colors the initial coloring differs 
           from a local optimum values. It is used when how specified as 
-          'distance', otherwise ignored.
+          'distance', otherwise ignored. Only the 'bfs' engine finds optima
+          by distance.
+      
+      lazy (bool) - if it is set to True a `CutGraph` view sharing the edges 
+          of the initial graph is returned instead of a copy. Default to False.
     
     Returns:
       :obj:`UDGraph` - the bipartite graph built from the binary coloring and
-          a complete graph in which a subgraph is found, if any and `how` is
+          the initial graph in which a subgraph is found, if any and `how` is
           correctly specified
+
+      :obj:`CutGraph` - a view of the bipartite graph, if `lazy` is True.
       
-      None - if a spanning subgraph is not found yet or a parameter `how` 
-          specified erroneously.
+      None - if a spanning subgraph is not found yet, a parameter `how` 
+          specified erroneously, or 'distance' is asked after annealing.
     """
     if not self._optimum:
       return None
@@ -201,6 +518,9 @@ class SpanningBGraph:
           self._min_coloring = col
     
     elif how == 'distance':
+
+      if self._engine != 'bfs':
+        return None
       
       self._min_coloring = self._optimum[distance][0]
       self._min_metrics  = self._optimum[distance][1]
@@ -208,11 +528,10 @@ class SpanningBGraph:
     else:
       return
 
-    self._bgraph = bipartite.graph.UDGraph(
-      edges=[ (i, j) for i in self.graph.get_vertices() 
-                     for j in range(i + 1, self.graph.vertices_num)
-                     if self._min_coloring[i] != self._min_coloring[j] ]
-    )
+    self._bgraph = bipartite.graph.CutGraph(self.graph, self._min_coloring)
+
+    if not lazy:
+      self._bgraph = self._bgraph.to_graph()
 
     return self._bgraph
 
@@ -225,7 +544,8 @@ class SpanningBGraph:
   def reindex(self):
     """ 
     Perform permutation of vertices indexes so that all the vertices of one
-    part of a bipartite graph comes first and, after them, the others. 
+    part of a bipartite graph comes first and, after them, the others. It 
+    takes O(V + E) time as edges of the initial graph are filtered.
     """
     if self._min_coloring is None:
       return None
@@ -243,46 +563,163 @@ class SpanningBGraph:
         permutations[i] = counter
         counter += 1
 
-    return bipartite.graph.UDGraph(
-        edges=[ (permutations[i], permutations[j]) 
-            for i in self.graph.get_vertices() 
-            for j in range(i + 1, self.graph.vertices_num)
-            if self._min_coloring[i] != self._min_coloring[j] ]
-        )
+    return bipartite.graph.CutGraph(
+        self.graph, self._min_coloring).to_graph(permutations)
 
 
   @staticmethod
   def is_bipartite(bgraphs, get_parts=False):
-
+    """ Ask whether a graph is bipartite, see `bipartite.tools.bipartition`. 
+    If `get_parts` is set to True returns the parts of the graph instead, or 
+    None if it is not bipartite. """
     if not bgraphs or not bgraphs.edges:
       return None
-    
-    one, two = {0}, set(bgraphs.edges[0])
 
-    completed = {0}
+    parts = bipartite.tools.bipartition(bgraphs)
+
+    if get_parts:
+      return parts
+
+    return parts is not None
+
+
+
+# A spanning bipartite graph finder of a worker process of a pool expanding
+# layers in parallel, see `SpanningBGraph.__expand_parallel`.
+_worker_spanning = None
 
+
+def _init_worker(graph):
+  global _worker_spanning
+  _worker_spanning = SpanningBGraph(graph)
+
+
+def _expand_shard(args):
+  init_code, shard = args
+  width = (_worker_spanning.graph.vertices_num + 7) // 8
+  return _worker_spanning._expand(shard, init_code, _StateSet(width))
+
+
+
+class _StateSet:
+  """
+  A compact hash set of non-negative ints of at most `width` bytes, e.g. 
+  colorings encoded as ints. The ints are stored in a flat buffer of slots of
+  a flag byte followed by `width` bytes of an int, and looked up by linear 
+  probing with Fibonacci hashing, so a state takes about 2 * (width + 1) 
+  bytes. If `directory` is given the buffer is a memory map of a temporary
+  file in it. The capacity is rounded up to a power of two as the slot of a
+  state is taken by a bit mask.
+  """
+
+  LOAD_FACTOR = 0.5
   
-    def __fill_parts(active, passive, incidence):
+  def __init__(self, width, capacity=1024, directory=None):
+    self.width = max(width, 1)
+    self.directory = directory
+    self.size = 0
+    self.__allocate(1 << max(capacity - 1, 1).bit_length())
+
+
+  def __len__(self):
+    return self.size
 
-      new_list = list()
 
-      for i in incidence:
-        if i not in completed:
-          completed.add(i)
-          new_list.extend(bgraphs.edges[i])
-          active |= set(bgraphs.edges[i])
+  def __contains__(self, state):
+    return self.__find(state.to_bytes(self.width, 'little'), state)[1]
+
+
+  def add(self, state):
+    """ Adds a state to the set. Returns whether it is new, so a state is 
+    checked and added by one lookup. """
+    slot_size, buffer, mask = self.width + 1, self.buffer, self.capacity - 1
+    key = state.to_bytes(self.width, 'little')
+    slot = ((hash(state) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> \
+           self.shift
+
+    # The probing of `__find` inlined as it is the hot path of a search
+    while True:
+      offset = slot * slot_size
+
+      if not buffer[offset]:
+        break
+      
+      if buffer[offset + 1:offset + slot_size] == key:
+        return False
       
-      if len(completed) == bgraphs.vertices_num:
-        return
+      slot = (slot + 1) & mask
+
+    buffer[offset] = 1
+    buffer[offset + 1:offset + slot_size] = key
+    self.size += 1
+
+    if self.size > self.capacity * _StateSet.LOAD_FACTOR:
+      self.__grow()
+
+    return True
+
+
+  def __allocate(self, capacity):
+    self.capacity = capacity
+    self.shift = 64 - capacity.bit_length() + 1
+    size = capacity * (self.width + 1)
 
-      __fill_parts(passive, active, new_list)
+    if self.directory is None:
+      self.buffer = bytearray(size)
     
+    else:
+      with tempfile.TemporaryFile(dir=self.directory) as file:
+        file.truncate(size)
+        self.buffer = mmap.mmap(file.fileno(), size)
+
+
+  def __slot(self, state):
+    """ Returns the first slot to probe for a state by Fibonacci hashing. """
+    return ((hash(state) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> \
+           self.shift
+
+
+  def __find(self, key, state):
+    """ Returns an offset of a slot of a state and whether it is found. """
+    slot_size, buffer = self.width + 1, self.buffer
+    slot = self.__slot(state)
+
+    while True:
+      offset = slot * slot_size
+
+      if not buffer[offset]:
+        return offset, False
+      
+      if buffer[offset + 1:offset + slot_size] == key:
+        return offset, True
+      
+      slot = (slot + 1) & (self.capacity - 1)
 
-    __fill_parts(one, two, bgraphs.edges[0])
 
-    # TODO: Check if conencted
+  def __put(self, offset, key):
+    self.buffer[offset] = 1
+    self.buffer[offset + 1:offset + self.width + 1] = key
 
-    return one.isdisjoint(two)
+
+  def __grow(self):
+    slot_size, buffer = self.width + 1, self.buffer
+    self.__allocate(2 * self.capacity)
+
+    mask, grown = self.capacity - 1, self.buffer
+
+    # The states are distinct, so each one is put to the first empty slot
+    for offset in range(0, len(buffer), slot_size):
+      if buffer[offset]:
+        key = buffer[offset + 1:offset + slot_size]
+        slot = self.__slot(int.from_bytes(key, 'little'))
+
+        while grown[slot * slot_size]:
+          slot = (slot + 1) & mask
+        
+        self.__put(slot * slot_size, key)
+    
+    if isinstance(buffer, mmap.mmap):
+      buffer.close()
 
 
    
@@ -309,55 +746,3 @@ if __name__ == '__main__':
   print('is bipartite 2?', spanning.is_bipartite(bgraph_con))
   print('graph is bipartite?', spanning.is_bipartite(spanning.graph))
 
-
-
-#  class __Node:
-#   """ 
-#   A containter for alorithm that find a spanning bipartite graph. Not in use
-#   for now.
-#   """
-
-#   def __init__(self, metrics, degree_max, degree_sum, distance):
-
-#     self.metrics    = metrics    
-#     self.degree_max = degree_max 
-#     self.degree_sum = degree_sum
-#     self.distance   = distance
-
-#   def __str__(self):
-#     return (f'node(mu={self.metrics:.4f}, max={self.degree_max}, sum='
-#             f'{self.degree_sum}, rho={self.distance})')
-
-
-#  def __evaluate_coloring(self, vertex, coloring, parent):
-
-#     degree_max = parent.degree_max
-#     degree_sum = 0
-#     degree_v = 0
-
-#     for u in self.graph.edges[vertex]:
-
-#       if coloring[vertex] == coloring[u]:
-#         degree_sum -= 2
-      
-#       else:
-#         degree_sum += 2
-#         degree_v += 1
-#         degree_u = 0
-
-#         for w in self.graph.edges[u]:
-#           if coloring[w] != coloring[u]:
-#             degree_u += 1
-          
-#         if degree_u > degree_max:
-#           degree_max = degree_u
-    
-#     degree_sum += parent.degree_sum
-#     if degree_v > degree_max:
-#       degree_max = degree_v
-
-#     return self.__Node(
-#               self.metrics(degree_max, degree_sum), 
-#               degree_max, 
-#               degree_sum, 
-#               parent.distance + 1)
@@ -0,0 +1,273 @@
+"""
+Created by Ivanov Roman and Maxim Dudin. This module contains streaming
+readers and writers of edge lists, edge colorings and search trajectories.
+The files are read and written in chunks, so the memory taken is bounded by a
+chunk size besides the graph built. Text files contain whitespace or comma
+separated integer columns, the lines starting with "#" or "%" are skipped as
+well as the text after "#" in a line.
+Binary files contain the columns as consecutive little-endian 4-byte ints. A
+file is compressed by gzip if its name ends with ".gz".
+
+https://github.com/severmore/pygraphs
+"""
+import gzip
+import itertools
+import sys
+from array import array
+
+import bipartite.graph
+import bipartite.spanning
+
+# The number of bytes read at once.
+CHUNK_SIZE = 1 << 20
+
+# The number of rows written at once.
+CHUNK_ROWS = 1 << 16
+
+_COMMENTS = (b'#', b'%')
+
+
+def read_chunks(path, columns=2, binary=False, chunk_size=CHUNK_SIZE):
+  """
+  Reads a file of integer columns, e.g. an edge list or a coloring written by
+  `write_coloring`, by blocks of about `chunk_size` bytes.
+
+  Args:
+    path(:obj:`str`) - a path of the file.
+
+    columns(int, optional) - the number of columns. Default to 2.
+
+    binary(bool, optional) - whether the file is binary. Default to False.
+
+    chunk_size(int, optional) - the number of bytes read at once. Default to
+        `CHUNK_SIZE`.
+
+  Yields:
+    :obj:`tuple` of :obj:`array` of int: the columns of a block of rows.
+
+  Raises:
+    ValueError: if the number of values in a block is not a multiple of
+        `columns`.
+  """
+  with _open(path, 'rb') as file:
+    blocks = _binary_blocks(file, chunk_size, columns) if binary else \
+             _text_blocks(file, chunk_size)
+
+    for block in blocks:
+      values = _parse_binary(block) if binary else _parse_text(block)
+
+      if len(values) % columns:
+        raise ValueError(f'{path} has rows of not {columns} values')
+
+      yield tuple(values[column::columns] for column in range(columns))
+
+
+def read_graph(path, undirected=True, vertices_num=0, binary=False,
+               chunk_size=CHUNK_SIZE):
+  """
+  Builds a graph from an edge list file read by `read_chunks`. The edges are
+  fed to the graph builder block by block without making a list of them.
+
+  Args:
+    path(:obj:`str`) - a path of the file.
+
+    undirected(bool, optional) - whether to build `UDGraph` or `Graph`.
+        Default to True.
+
+    vertices_num(int, optional) - the intended number of vertices, see
+        `Graph`. Default to 0.
+
+    binary(bool, optional) - whether the file is binary. Default to False.
+
+    chunk_size(int, optional) - the number of bytes read at once. Default to
+        `CHUNK_SIZE`.
+
+  Returns:
+    :obj:`Graph` - the graph built.
+  """
+  klass = bipartite.graph.UDGraph if undirected else bipartite.graph.Graph
+  chunks = read_chunks(path, 2, binary, chunk_size)
+
+  return klass(edges=itertools.chain.from_iterable(
+                   zip(starts, ends) for starts, ends in chunks),
+               vertices_num=vertices_num)
+
+
+def write_edges(graph, path, binary=False, chunk_size=CHUNK_ROWS):
+  """
+  Writes edges of a graph as rows "start end". The edges of an undirected
+  graph are written once as (start, end) with start < end, so loops are not
+  written. Returns the number of rows written.
+  """
+  undirected = getattr(graph, 'undirected',
+                       isinstance(graph, bipartite.graph.UDGraph))
+  rows = ( (start, end) for start, incidence in enumerate(graph.edges)
+                        for end in incidence
+                        if not undirected or start < end )
+
+  return _write_rows(path, rows, 2, binary, chunk_size)
+
+
+def write_coloring(coloring, path, binary=False, chunk_size=CHUNK_ROWS):
+  """
+  Writes an edge coloring - `EdgeColoring` or a dict of (start, end) - color,
+  as rows "start end color". If the coloring is of an undirected graph each
+  edge is written once as for `write_edges`. A dict is taken as a coloring of
+  an undirected graph with one or both halves of each edge given. Returns the
+  number of rows written.
+  """
+  graph = getattr(coloring, 'graph', None)
+
+  if graph is None:
+    rows = ( (min(start, end), max(start, end), color) 
+               for (start, end), color in coloring.items()
+               if start < end or (end, start) not in coloring )
+  
+  else:
+    undirected = getattr(graph, 'undirected', False)
+    rows = ( (start, end, color) for (start, end), color in coloring.items()
+                                 if not undirected or start < end )
+
+  return _write_rows(path, rows, 3, binary, chunk_size)
+
+
+def write_trajectory(spanning, path, chunk_size=CHUNK_ROWS):
+  """
+  Writes the optimum colorings found by a `SpanningBGraph` search on each
+  distance from the initial coloring as text rows "distance metrics coloring",
+  where a coloring is a string of colors of vertices. Returns the number of
+  rows written.
+
+  Raises:
+    ValueError: if the search is not by the 'bfs' engine, as annealing keeps
+        only the endpoints of its walk.
+  """
+  if spanning._engine != 'bfs':
+    raise ValueError('only a search by the "bfs" engine has a trajectory')
+
+  to_str = bipartite.spanning.SpanningBGraph.to_str
+  rows = ( f'{distance} {metrics!r} '
+           f'{"-" if coloring is None else to_str(coloring)}\n'
+             for distance, (coloring, metrics)
+             in enumerate(spanning._optimum) )
+
+  with _open(path, 'wb') as file:
+    file.write(b'# distance metrics coloring\n')
+    return _write_chunks(file, rows, chunk_size)
+
+
+def _open(path, mode):
+  # The default level 9 of gzip is several times slower than 6 of zlib while
+  # it compresses edge lists just a bit better.
+  if str(path).endswith('.gz'):
+    return gzip.open(path, mode, compresslevel=6)
+  return open(path, mode)
+
+
+def _text_blocks(file, chunk_size):
+  """ Yields blocks of whole lines of about `chunk_size` bytes. """
+  rest = b''
+
+  while True:
+    data = file.read(chunk_size)
+    if not data:
+      break
+
+    data = rest + data
+    cut = data.rfind(b'\n') + 1
+    rest = data[cut:]
+
+    if cut:
+      yield data[:cut]
+
+  if rest:
+    yield rest
+
+
+def _binary_blocks(file, chunk_size, columns):
+  """ Yields blocks of whole rows of at most `chunk_size` bytes. """
+  row_size = 4 * columns
+  chunk_size = max(chunk_size - chunk_size % row_size, row_size)
+
+  while True:
+    data = file.read(chunk_size)
+    if not data:
+      break
+    yield data
+
+
+def _parse_text(block):
+  if any(comment in block for comment in _COMMENTS):
+    block = b'\n'.join(line.split(b'#', 1)[0] for line in block.split(b'\n')
+                       if not line.lstrip().startswith(_COMMENTS))
+
+  return array('i', map(int, block.replace(b',', b' ').split()))
+
+
+def _parse_binary(block):
+  values = array('i')
+  values.frombytes(block[:len(block) - len(block) % values.itemsize])
+
+  if sys.byteorder == 'big':
+    values.byteswap()
+
+  return values
+
+
+def _write_rows(path, rows, columns, binary, chunk_size):
+  """ Writes rows of `columns` ints as text or binary, see the module doc. """
+  with _open(path, 'wb') as file:
+
+    if not binary:
+      line = ' '.join(['%d'] * columns) + '\n'
+      return _write_chunks(file, (line % row for row in rows), chunk_size)
+
+    count = 0
+
+    while True:
+      values = array('i', itertools.chain.from_iterable(
+                              itertools.islice(rows, chunk_size)))
+      if not values:
+        return count
+
+      if sys.byteorder == 'big':
+        values.byteswap()
+
+      file.write(values)
+      count += len(values) // columns
+
+
+def _write_chunks(file, lines, chunk_size):
+  """ Writes text lines joined by chunks of `chunk_size` lines. Returns the
+  number of lines. """
+  count = 0
+
+  while True:
+    chunk = list(itertools.islice(lines, chunk_size))
+    if not chunk:
+      return count
+
+    file.write(''.join(chunk).encode())
+    count += len(chunk)
+
+
+if __name__ == '__main__':
+  import os
+  import tempfile
+
+  import bipartite.coloring
+
+  graph = bipartite.graph.UDGraph(edges=
+      [ (0, 3), (0, 4), (1, 3), (1, 4), (1, 5), (2, 3)])
+
+  with tempfile.TemporaryDirectory() as directory:
+    path = os.path.join(directory, 'graph.txt.gz')
+
+    write_edges(graph, path)
+    print(read_graph(path))
+
+    coloring = bipartite.coloring.colorize(graph)
+    write_coloring(coloring, path)
+
+    for starts, ends, colors in read_chunks(path, columns=3):
+      print(starts.tolist(), ends.tolist(), colors.tolist())
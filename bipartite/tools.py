@@ -3,75 +3,352 @@ Created by Ivanov Roman.
 
 https://github.com/severmore/pygraphs
 """
-from collections import deque
+import itertools
+from array import array
 
+import bipartite.graph
 
-def dfs(graph, func, start=0):
+
+def traverse(graph, mode='dfs', start=None, pre_visit=None, post_visit=None, 
+             non_tree_edge=None):
   """
-  Traverse a `graph` using depth-first search and starting with `start`, and 
-  apply function `func` to each vertices.
+  Traverse a `graph` iteratively using depth-first or breadth-first search in 
+  O(V + E) time. The depth-first search keeps an explicit stack and a cursor
+  to the next edge of each vertex, so it has no recursion depth limit.
+
+  Args:
+    graph(:obj:`Graph`) - a graph to traverse.
+
+    mode(str) - 'dfs' for depth-first search or 'bfs' for breadth-first one. 
+        Default to 'dfs'.
+
+    start(int, optional) - a vertex to start with. Only its connected 
+        component is traversed. Default to None, then the vertices are taken 
+        as roots in turn and all the graph is traversed.
+
+    pre_visit(callable, optional) - called as `pre_visit(vertex, parent)` when 
+        a vertex is discovered, `parent` is -1 for roots.
+
+    post_visit(callable, optional) - called as `post_visit(vertex, parent)` 
+        when all the edges of a vertex are scanned, and for depth-first search
+        all its descendants are finished.
+    
+    non_tree_edge(callable, optional) - called as `non_tree_edge(vertex, end)`
+        for an edge to a vertex already discovered.
+
+  If any of the hooks returns True the traversal stops.
+
+  Returns:
+    :obj:`array` of int - the vertices in order of their discovery.
   """
-  stack = deque()
-  visited = [False for _ in graph.get_vertices()]
+  roots = graph.get_vertices() if start is None else (start,)
+  return _traverse(graph, mode, roots, pre_visit, post_visit, 
+                   non_tree_edge)[0]
+
+
+def _traverse(graph, mode, roots, pre_visit=None, post_visit=None, 
+              non_tree_edge=None):
+  """ 
+  The core of `traverse`. Returns the vertices in order of their discovery, 
+  offsets of the trees grown from the roots in the order as in `indptr` of 
+  `CSRGraph`, and whether the traversal is stopped by a hook.
+  """
+  edges = graph.edges
+  discovered = bytearray(graph.vertices_num)
+  parent = array('i', [-1]) * graph.vertices_num
+  cursor = array('i', [0]) * graph.vertices_num
+
+  order = array('i')
+  offsets = array('i', [0])
+
+  for root in roots:
+
+    if discovered[root]:
+      continue
+
+    discovered[root] = 1
+    order.append(root)
+
+    if pre_visit and pre_visit(root, -1):
+      return order, offsets, True
+
+    if mode == 'dfs':
+      stack = [root]
 
-  for vertex in graph.get_vertices():
-    if not visited[vertex]:
-      
-      stack.append(vertex)
-      visited[vertex] = True
-      
       while stack:
-        v = stack.pop()
-        func(v)
+        vertex = stack[-1]
+        incidence = edges[vertex]
+        index = cursor[vertex]
 
-        for destination in graph.edges[v]:
-          if not visited[destination]:
-            stack.append(destination)
-            visited[destination] = True
+        while index < len(incidence):
+          end = incidence[index]
+          index += 1
 
+          if not discovered[end]:
+            discovered[end] = 1
+            parent[end] = vertex
+            order.append(end)
+            stack.append(end)
 
-def dfs2(graph, func, start=0):
+            if pre_visit and pre_visit(end, vertex):
+              return order, offsets, True
+            break
+
+          if non_tree_edge and non_tree_edge(vertex, end):
+            return order, offsets, True
+
+        else:
+          stack.pop()
+
+          if post_visit and post_visit(vertex, parent[vertex]):
+            return order, offsets, True
+        
+        cursor[vertex] = index
+    
+    else:
+      head = len(order) - 1
+
+      while head < len(order):
+        vertex = order[head]
+        head += 1
+
+        for end in edges[vertex]:
+
+          if not discovered[end]:
+            discovered[end] = 1
+            parent[end] = vertex
+            order.append(end)
+
+            if pre_visit and pre_visit(end, vertex):
+              return order, offsets, True
+          
+          elif non_tree_edge and non_tree_edge(vertex, end):
+            return order, offsets, True
+        
+        if post_visit and post_visit(vertex, parent[vertex]):
+          return order, offsets, True
+    
+    offsets.append(len(order))
+
+  return order, offsets, False
+
+
+def dfs(graph, func, start=0):
   """
   Traverse a `graph` using depth-first search and starting with `start`, and 
-  apply function `func` to each vertices. Recursive call.
+  apply function `func` to each vertices. The other connected components are
+  traversed after the one of `start`. See `traverse` to get the order of 
+  vertices in bulk.
   """
-  visited = [False for _ in graph.get_vertices()]
+  roots = itertools.chain((start,), graph.get_vertices())
 
-  def __recursive(start):
-    visited[start] = True
-    func(start)
+  for vertex in _traverse(graph, 'dfs', roots)[0]:
+    func(vertex)
 
-    for destination in graph.edges[start]:
-      if not visited[destination]:
-        __recursive(destination)
 
-  __recursive(start)
+def dfs2(graph, func, start=0):
+  """
+  Traverse a connected component of a `graph` using depth-first search and 
+  starting with `start`, and apply function `func` to each vertices. 
+  """
+  for vertex in traverse(graph, 'dfs', start):
+    func(vertex)
 
 
-def has_cycle(graph):
+def components(graph):
+  """ 
+  Finds connected components of a graph with symmetric incidence lists. 
+  Returns an array of a component of each vertex and the number of components.
+  Components are numbered in order of their smallest vertices.
+  """
+  order, offsets, _ = _traverse(graph, 'bfs', graph.get_vertices())
+  labels = array('i', [0]) * graph.vertices_num
+
+  for component in range(len(offsets) - 1):
+    for vertex in order[offsets[component]:offsets[component + 1]]:
+      labels[vertex] = component
+  
+  return labels, len(offsets) - 1
+
+
+def split_components(graph):
+  """
+  Splits a graph with symmetric incidence lists into its connected components.
+  Each component is relabelled to a compact `CSRGraph` on vertices 0, ..., k-1
+  that keeps the order of vertices and of their incidences, so the position 
+  `p` of the incidence of the `i`-th vertex of a component corresponds to the
+  position `p` of the incidence of the original vertex `vertices[i]`. It takes
+  O(V + E) time.
+
+  Args:
+    graph(:obj:`Graph`) - a graph to split.
+
+  Returns:
+    :obj:`list` of (:obj:`CSRGraph`, :obj:`array` of int): components in order
+        of their smallest vertices, each with the map of its vertices to the
+        vertices of the graph.
   """
-  Ask whether a graph given has cycle or not.
+  labels, count = components(graph)
+  undirected = getattr(graph, 'undirected', 
+                       isinstance(graph, bipartite.graph.UDGraph))
+
+  members = [ array('i') for _ in range(count) ]
+  local = array('i', [0]) * graph.vertices_num
+
+  for vertex in graph.get_vertices():
+    vertices = members[labels[vertex]]
+    local[vertex] = len(vertices)
+    vertices.append(vertex)
+
+  parts = []
+
+  for vertices in members:
+    indptr, indices = array('i', [0]), array('i')
+
+    for vertex in vertices:
+      indices.extend([ local[end] for end in graph.edges[vertex] ])
+      indptr.append(len(indices))
+    
+    component = bipartite.graph.CSRGraph(indptr=indptr, indices=indices, 
+                                         undirected=undirected)
+    parts.append((component, vertices))
+  
+  return parts
+
+
+def has_cycle(graph):
   """
-  visited = [False for _ in graph.get_vertices()]
+  Ask whether a graph given has cycle or not. For an undirected graph, i.e. 
+  `UDGraph` or undirected `CSRGraph`, a cycle is found by a non-tree edge of a
+  depth-first search, the edge to a parent is skipped once, so parallel edges 
+  and loops form cycles. For a directed graph a cycle is found by an edge to 
+  a vertex which is on the stack of the search.
 
-  def _has_cycle(vertex, parent):
-    visited[vertex] = True
+  Note:
+    For a directed `Graph` only directed cycles count, so a DAG has no cycle
+    even if its edges form a cycle regardless of their direction, e.g. the
+    edges (0, 1), (0, 2), (1, 3), (2, 3). Formerly any edge to a visited 
+    vertex other than the parent counted. To look for a cycle regardless of 
+    directions ask about `UDGraph(graph=graph)`.
+  """
+  vertices_num = graph.vertices_num
+  undirected = getattr(graph, 'undirected', 
+                       isinstance(graph, bipartite.graph.UDGraph))
+  
+  if undirected:
+    parents = array('i', [-1]) * vertices_num
+    skipped = bytearray(vertices_num)
 
-    for destination in graph.edges[vertex]:
+    def pre_visit(vertex, parent):
+      parents[vertex] = parent
+    
+    post_visit = None
+    
+    def non_tree_edge(vertex, end):
+      if end == parents[vertex] and not skipped[vertex]:
+        skipped[vertex] = 1
+        return False
+      
+      return True
 
-      if destination != parent and visited[destination]:
-        return True
+  else:
+    # 1 - a vertex is on the stack, 2 - it is finished.
+    state = bytearray(vertices_num)
 
-      elif _has_cycle(destination, vertex):
-        return True
+    def pre_visit(vertex, parent):
+      state[vertex] = 1
     
-    return False
+    def post_visit(vertex, parent):
+      state[vertex] = 2
+    
+    def non_tree_edge(vertex, end):
+      return state[end] == 1
+  
+  return _traverse(graph, 'dfs', graph.get_vertices(), pre_visit, post_visit,
+                   non_tree_edge)[2]
 
-  for vertex in graph.get_vertices():
-    if not visited[vertex] and _has_cycle(vertex, -1):
-        return True
+
+def bipartition(graph, odd_cycle=False):
+  """
+  Finds the parts of a bipartite graph by an iterative breadth-first search 
+  2-coloring of all its connected components in O(V + E) time. The incidence
+  lists of a graph are assumed to be symmetric, as in `UDGraph` and undirected
+  `CSRGraph`.
+
+  Args:
+    graph(:obj:`Graph`) - a graph to split into two parts.
+
+    odd_cycle(bool, optional) - if it is set to True an odd cycle is returned 
+        as well to witness that the graph is not bipartite. Default to False.
+
+  Returns:
+    :obj:`bytearray` - a part (0 or 1) of each vertex, or None if the graph is
+        not bipartite.
+
+    :obj:`bytearray`, :obj:`list` of int - the parts and an odd cycle as a list
+        of its vertices, if `odd_cycle` is set to True. Exactly one of them is 
+        None.
+  """
+  parts = bytearray(graph.vertices_num)
+  parent = array('i', [-1]) * graph.vertices_num
+  queue = array('i', [0]) * graph.vertices_num
+  
+  head = tail = 0
+
+  for root in graph.get_vertices():
+
+    if parent[root] >= 0:
+      continue
+
+    parent[root] = root
+    queue[tail] = root
+    tail += 1
+
+    while head < tail:
+      vertex = queue[head]
+      head += 1
+
+      for end in graph.edges[vertex]:
+
+        if parent[end] < 0:
+          parent[end] = vertex
+          parts[end] = parts[vertex] ^ 1
+          queue[tail] = end
+          tail += 1
+        
+        elif parts[end] == parts[vertex]:
+
+          if odd_cycle:
+            return None, _odd_cycle(parent, vertex, end)
+          
+          return None
   
-  return False
+  if odd_cycle:
+    return parts, None
+
+  return parts
+
+
+def _odd_cycle(parent, one, two):
+  """ Returns an odd cycle closed by an edge connecting vertices `one` and 
+  `two` of the same depth in a breadth-first search tree given by `parent`. 
+  """
+  path_one, path_two = [one], [two]
+
+  while one != two:
+    one, two = parent[one], parent[two]
+    path_one.append(one)
+    path_two.append(two)
+  
+  path_two.pop()
+  path_two.reverse()
+
+  return path_one + path_two
+
+
+def is_bipartite(graph):
+  """ Ask whether a graph given is bipartite or not. """
+  return bipartition(graph) is not None
 
 
 if __name__ == '__main__':
@@ -87,3 +364,11 @@ if __name__ == '__main__':
 
   print(has_cycle(get_cycle()))
 
+  get_odd_cycle = lambda: bipartite.graph.UDGraph(edges=[
+        (0,1), (1,2), (2,3), (3,4), (4,5), (5,1)])
+
+  print(bipartition(get_odd_cycle(), odd_cycle=True))
+
+  for component, vertices in split_components(bipartite.graph.UDGraph(
+        edges=[(0,3), (3,1), (2,5), (5,4)], vertices_num=7)):
+    print(vertices.tolist(), component)
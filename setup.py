@@ -15,5 +15,5 @@ setup(
   auhtor_email = 'iromcorp@gmail.com',
   url = 'https://github.com/severmore/pygraphs.git',
   license = license_,
-  packages = find_packages(exclude=('tests', 'docs'))
+  packages = find_packages(exclude=('tests', 'docs', 'benchmarks'))
 )
@@ -0,0 +1,1137 @@
+import unittest
+import random
+import bipartite.graph
+import bipartite.tools
+import bipartite.coloring
+import bipartite.spanning
+import bipartite.matching
+import bipartite.generating
+import bipartite.streams
+
+class CSRGraphTestCase(unittest.TestCase):
+  """ Test compressed sparse row graph and its conversion. """
+
+  EDGES_LIST = [ (0, 1), (0, 3), (1, 2), (2, 0), (2, 3) ]
+
+  def test_csr_graph_from_undirected_graph(self):
+    graph = bipartite.graph.UDGraph(edges=self.EDGES_LIST)
+    csr = bipartite.graph.CSRGraph(graph=graph)
+    self.assertTrue(csr.undirected)
+    self.assertEqual(csr.vertices_num, graph.vertices_num)
+    self.assertEqual(csr.max_degree, graph.max_degree)
+    self.assertListEqual(list(csr.indptr), [0, 3, 5, 8, 10])
+    self.assertListEqual([ csr.degree(v) for v in csr.get_vertices() ],
+                         [ graph.degree(v) for v in graph.get_vertices() ])
+    self.assertListEqual(list(csr.edges[2]), graph.edges[2])
+    self.assertEqual(csr, graph)
+
+  def test_csr_graph_round_trip(self):
+    graph = bipartite.graph.Graph(edges=self.EDGES_LIST)
+    restored = bipartite.graph.CSRGraph(graph=graph).to_graph()
+    self.assertIs(restored.__class__, bipartite.graph.Graph)
+    self.assertListEqual(restored.edges, graph.edges)
+    self.assertEqual(restored.max_degree, graph.max_degree)
+
+  def test_csr_graph_empty(self):
+    csr = bipartite.graph.CSRGraph()
+    self.assertEqual(csr.vertices_num, 0)
+    self.assertEqual(csr.max_degree, 0)
+    self.assertFalse(csr.edges)
+
+  def test_csr_graph_in_algorithms(self):
+    graph = bipartite.graph.UDGraph(edges=[ (0,2), (0,3), (1,2), (1,3) ])
+    csr = bipartite.graph.CSRGraph(graph=graph)
+    visited = list()
+    bipartite.tools.dfs(csr, visited.append)
+    self.assertListEqual(sorted(visited), list(csr.get_vertices()))
+    coloring = bipartite.coloring.colorize(csr)
+    self.assertTrue(bipartite.coloring.is_valid(coloring, csr))
+    spanning = bipartite.spanning.SpanningBGraph(csr)
+    self.assertIsNotNone(spanning((0, 0, 0, 0), 1))
+
+
+
+class StreamingGraphTestCase(unittest.TestCase):
+  """ Test building graphs from iterables in a single pass. """
+
+  EDGES = [ (0, 1), (0, 3), (1, 2), (2, 0), (2, 3) ]
+
+  def test_graph_from_generator(self):
+    graph = bipartite.graph.UDGraph(edges=(edge for edge in self.EDGES))
+    self.assertEqual(graph, bipartite.graph.UDGraph(edges=self.EDGES))
+    self.assertEqual(graph.vertices_num, 4)
+    self.assertEqual(graph.max_degree, 3)
+
+    graph = bipartite.graph.Graph(edges=iter(self.EDGES), vertices_num=6)
+    self.assertEqual(graph.vertices_num, 6)
+    self.assertEqual(graph.max_degree, 2)
+
+  def test_undirected_incidence_order(self):
+    # The ends of edges come first, then the edges of a graph given, then the
+    # starts of edges
+    graph = bipartite.graph.UDGraph(edges=iter(self.EDGES))
+    self.assertListEqual(graph.edges, [ [1, 3, 2], [2, 0], [0, 3, 1], [0, 2] ])
+
+    origin = bipartite.graph.Graph(edges=self.EDGES)
+    graph = bipartite.graph.UDGraph(graph=origin, 
+                                    edges=iter([ (4, 1), (4, 2) ]))
+    self.assertListEqual(graph.edges, 
+                         [ [1, 3, 2], [2, 4, 0], [0, 3, 4, 1], [0, 2], [1, 2] ])
+    self.assertEqual(graph.max_degree, 4)
+
+  def test_graph_from_arrays(self):
+    from array import array
+    starts = array('i', [ start for start, _ in self.EDGES ])
+    ends = array('i', [ end for _, end in self.EDGES ])
+
+    graph = bipartite.graph.UDGraph.from_arrays(starts, ends)
+    self.assertIsInstance(graph, bipartite.graph.UDGraph)
+    self.assertEqual(graph, bipartite.graph.UDGraph(edges=self.EDGES))
+
+    graph = bipartite.graph.Graph.from_arrays(starts, ends)
+    self.assertEqual(graph, bipartite.graph.Graph(edges=self.EDGES))
+    self.assertEqual(graph.max_degree, 2)
+
+
+
+class GraphFileTestCase(unittest.TestCase):
+  """ Test saving graphs to binary CSR files and loading them by mmap. """
+
+  EDGES = [ (0, 3), (0, 4), (1, 3), (2, 4), (2, 5) ]
+
+  def setUp(self):
+    import os, tempfile
+    self.directory = tempfile.TemporaryDirectory()
+    self.path = os.path.join(self.directory.name, 'graph.bin')
+
+  def tearDown(self):
+    self.directory.cleanup()
+
+  def test_save_load_mmap(self):
+    graph = bipartite.graph.UDGraph(edges=self.EDGES)
+    graph.save(self.path)
+    loaded = bipartite.graph.Graph.load(self.path)
+
+    self.assertIsInstance(loaded, bipartite.graph.CSRGraph)
+    self.assertIsInstance(loaded.indices, memoryview)
+    self.assertTrue(loaded.undirected)
+    self.assertEqual(loaded.vertices_num, graph.vertices_num)
+    self.assertEqual(loaded.max_degree, graph.max_degree)
+    self.assertEqual([ list(inc) for inc in loaded.edges ], graph.edges)
+
+  def test_save_load_copy(self):
+    graph = bipartite.graph.Graph(edges=self.EDGES)
+    bipartite.graph.CSRGraph(graph=graph).save(self.path)
+
+    loaded = bipartite.graph.Graph.load(self.path, mmap=False)
+    self.assertIs(type(loaded), bipartite.graph.Graph)
+    self.assertEqual(loaded.edges, graph.edges)
+
+    loaded = bipartite.graph.CSRGraph.load(self.path, mmap=False)
+    self.assertFalse(loaded.undirected)
+    self.assertEqual(loaded.indices.tolist(), [ 3, 4, 3, 4, 5 ])
+
+  def test_pickle_mapped_graph(self):
+    import pickle
+    bipartite.graph.UDGraph(edges=self.EDGES).save(self.path)
+    loaded = bipartite.graph.Graph.load(self.path)
+    copy = pickle.loads(pickle.dumps(loaded))
+
+    self.assertEqual(copy.path, self.path)
+    self.assertEqual(copy, loaded)
+
+  def test_load_invalid_file(self):
+    with open(self.path, 'wb') as file:
+      file.write(b'not a graph')
+    self.assertRaises(ValueError, bipartite.graph.Graph.load, self.path)
+
+    bipartite.graph.Graph(edges=self.EDGES).save(self.path)
+    with open(self.path, 'r+b') as file:
+      file.truncate(60)
+
+    for mmap in (True, False):
+      self.assertRaises(ValueError, bipartite.graph.Graph.load, self.path, 
+                        mmap)
+
+
+
+class EdgeIndexedGraphTestCase(unittest.TestCase):
+  """ Test removing edges by handles in edge-indexed mode. """
+
+  EDGES = [ (0, 1), (0, 2), (0, 3), (1, 2), (2, 3), (3, 1) ]
+
+  def assert_twins(self, graph):
+    for start, incidence in enumerate(graph.edges):
+      for index, end in enumerate(incidence):
+        twin = graph.twins[start][index]
+        self.assertEqual(graph.edges[end][twin], start)
+        self.assertEqual(graph.twins[end][twin], index)
+
+  def test_graph_remove_edge_at(self):
+    graph = bipartite.graph.Graph(edges=[ (0, 1), (0, 2), (0, 3) ])
+    self.assertEqual(graph.remove_edge_at(0, 0), 1)
+    self.assertListEqual(graph.edges[0], [3, 2])
+
+  def test_indexed_remove_edge_at(self):
+    graph = bipartite.graph.UDGraph(edges=self.EDGES, indexed=True)
+    self.assert_twins(graph)
+    end = graph.remove_edge_at(2, 0)
+    graph_ref = bipartite.graph.UDGraph(edges=self.EDGES)
+    graph_ref.remove_edge(2, end)
+    self.assertEqual(graph, graph_ref)
+    self.assert_twins(graph)
+
+  def test_indexed_add_edge_and_union(self):
+    graph = bipartite.graph.UDGraph(edges=self.EDGES, indexed=True)
+    graph.add_edge(1, 0)
+    graph.union(bipartite.graph.UDGraph(edges=[ (2, 0) ], vertices_num=4,
+                                        indexed=True))
+    self.assert_twins(graph)
+    self.assertEqual(graph, bipartite.graph.UDGraph(
+        edges=self.EDGES + [ (1, 0), (2, 0) ]))
+
+  def test_euler_split_is_partition(self):
+    graph = bipartite.graph.UDGraph(edges=self.EDGES)
+    g1, g2 = bipartite.matching.euler_split(graph)
+    self.assertTrue(all(graph.degree(v) == 0 for v in graph.get_vertices()))
+    g1.union(g2)
+    self.assert_twins(g1)
+    self.assertEqual(g1, bipartite.graph.UDGraph(edges=self.EDGES))
+
+
+
+class SustainedEulerPartitionTestCase(unittest.TestCase):
+  """ Test Euler partition that keeps the graph untouched. """
+
+  EDGES = [ (0, 3), (0, 4), (1, 3), (1, 4), (1, 5), (2, 3) ]
+
+  def get_edges(self, partition):
+    return sorted((min(start, end), max(start, end)) 
+                    for path in partition 
+                    for start, end in zip(path, path[1:]))
+
+  def test_sustained_partition_keeps_graph(self):
+    graph = bipartite.graph.UDGraph(edges=self.EDGES)
+    edges = [ list(incidence) for incidence in graph.edges ]
+    partition = bipartite.matching.euler_partition(graph, sustain_graph=True)
+    self.assertListEqual(graph.edges, edges)
+    self.assertListEqual(self.get_edges(partition), sorted(self.EDGES))
+
+  def test_sustained_partition_indexes_graph_once(self):
+    graph = bipartite.graph.UDGraph(edges=self.EDGES)
+    partition = bipartite.matching.euler_partition(graph, sustain_graph=True)
+
+    twins = graph.twins
+    self.assertIsNotNone(twins)
+    self.assertListEqual(
+        bipartite.matching.euler_partition(graph, sustain_graph=True), 
+        partition)
+    self.assertIs(graph.twins, twins)
+    self.assertListEqual(self.get_edges(partition), sorted(self.EDGES))
+
+  def test_sustained_partition_of_csr_graph(self):
+    graph = bipartite.graph.CSRGraph(
+        graph=bipartite.graph.UDGraph(edges=self.EDGES))
+    partition = bipartite.matching.euler_partition(graph)
+    self.assertListEqual(self.get_edges(partition), sorted(self.EDGES))
+    self.assertEqual(
+        sum(1 for path in partition if path[0] != path[-1]), 2)
+
+  def test_csr_edge_twins(self):
+    graph = bipartite.graph.CSRGraph(
+        graph=bipartite.graph.UDGraph(edges=self.EDGES + [ (0, 3) ]))
+    twins = graph.edge_twins()
+    for vertex in graph.get_vertices():
+      for position in range(graph.indptr[vertex], graph.indptr[vertex + 1]):
+        self.assertEqual(twins[twins[position]], position)
+        self.assertEqual(graph.indices[twins[position]], vertex)
+
+
+
+class IterativeColeHopcroftColoringTestCase(unittest.TestCase):
+  """ Test Cole-Hopcroft coloring by in-place Euler splits. """
+
+  def get_graph(self, part_size, degree):
+    edges = [ (i, part_size + (i + shift) % part_size) 
+                for i in range(part_size) for shift in range(degree) ]
+    return bipartite.graph.UDGraph(edges=edges)
+
+  def assert_coloring(self, coloring, graph):
+    self.assertTrue(bipartite.coloring.is_valid(coloring, graph))
+    self.assertEqual(max(coloring.values()) + 1, graph.max_degree)
+    self.assertEqual(len(coloring), sum(map(len, graph.edges)))
+
+  def test_cole_hopcroft_odd_degree(self):
+    graph = bipartite.graph.UDGraph(edges=
+        [ (0, 3), (0, 4), (1, 3), (1, 4), (1, 5), (2, 3) ])
+    coloring = bipartite.coloring.colorize(graph, algorithm='Cole-Hopcroft')
+    self.assert_coloring(coloring, graph)
+
+  def test_cole_hopcroft_keeps_graph(self):
+    graph = self.get_graph(8, 6)
+    edges = [ list(incidence) for incidence in graph.edges ]
+    coloring = bipartite.coloring.colorize(graph, algorithm='Cole-Hopcroft')
+    self.assertListEqual(graph.edges, edges)
+    self.assert_coloring(coloring, graph)
+
+  def test_cole_hopcroft_high_degree(self):
+    graph = self.get_graph(130, 129)
+    coloring = bipartite.coloring.colorize(graph, algorithm='Cole-Hopcroft')
+    self.assert_coloring(coloring, graph)
+
+  def test_covering_matching_by_splitter(self):
+    from array import array
+    edges = [ (0, 3), (0, 4), (0, 5), (1, 3), (1, 4), (2, 5) ]
+    starts = array('i', [ s for s, _ in edges ] + [0] * 6)
+    ends = array('i', [ e for _, e in edges ] + [0] * 6)
+    splitter = bipartite.matching.EulerSplitter(starts, ends, 6, len(edges))
+    mid = splitter.cover(0, len(edges), 3)
+    matching = list(zip(starts[:mid], ends[:mid]))
+    vertices = [ v for edge in matching for v in edge ]
+    self.assertEqual(len(vertices), len(set(vertices)))
+    self.assertIn(0, vertices)
+
+  def test_keep_half_equals_halve(self):
+    from array import array
+    edges = [ (0, 3), (0, 4), (0, 5), (1, 3), (1, 4), (2, 5), (0, 6), (1, 7) ]
+    starts = array('i', [ s for s, _ in edges ] + [0] * 8)
+    ends = array('i', [ e for _, e in edges ] + [0] * 8)
+    splitter = bipartite.matching.EulerSplitter(starts, ends, 8, 6)
+
+    positions, weights = list(range(8)), [ 3, 1, 2, 5, 4, 1, 3, 2 ]
+    half = min(splitter.halve(positions, weights), 
+               key=lambda half: sum(w for p, w in zip(*half) if p >= 6))
+
+    for position, weight in zip(positions, weights):
+      splitter.work[position] = position
+      splitter.weights[position] = weight
+    size = splitter.keep_half(len(positions))
+
+    self.assertEqual(splitter.work[:size].tolist(), half[0])
+    self.assertEqual([ splitter.weights[p] for p in half[0] ], half[1])
+
+
+
+class VisingColorTablesTestCase(unittest.TestCase):
+  """ Test missing color bitmasks and color tables of Vising coloring. """
+
+  EDGES = [ (0, 3), (0, 4), (1, 3), (1, 4), (1, 5), (2, 3) ]
+
+  def test_set_color_updates_tables(self):
+    graph = bipartite.graph.UDGraph(edges=self.EDGES)
+    vising = bipartite.coloring.VisingColoring(graph)
+    vising.set_color(1, 2, 0)
+    vising.set_color(1, 3, 2)
+    self.assertEqual(vising.get_missing_color(1), 1)
+    self.assertSetEqual(vising.get_missing_colors(1), {1})
+    self.assertEqual(vising.get_common_missing_color(1, 0), 1)
+    self.assertEqual(vising.graph.indices[vising.get_edge(3, 0)], 1)
+    vising.set_color(1, 2, 1)
+    self.assertIsNone(vising.get_edge(3, 0))
+    self.assertEqual(vising.get_edge(1, 1), 2)
+    self.assertEqual(vising.get_missing_color(3), 0)
+
+  def test_vising_coloring_with_alternating_paths(self):
+    graph = bipartite.graph.UDGraph(edges=[ (0, 4), (1, 4), (1, 5), (2, 5), 
+                                            (2, 6), (3, 6), (3, 7), (0, 7) ])
+    coloring = bipartite.coloring.colorize(graph)
+    self.assertTrue(bipartite.coloring.is_valid(coloring, graph))
+    self.assertSetEqual(set(coloring.values()), {0, 1})
+
+
+
+class EdgeColoringTestCase(unittest.TestCase):
+  """ Test compact edge coloring storage and its dict view. """
+
+  EDGES = [ (0, 3), (0, 4), (1, 3), (1, 4), (1, 5), (2, 3) ]
+
+  def test_coloring_array_and_view(self):
+    graph = bipartite.graph.UDGraph(edges=self.EDGES)
+    coloring = bipartite.coloring.colorize(graph)
+    self.assertEqual(coloring.colors.typecode, 'h')
+    self.assertEqual(len(coloring), 2 * len(self.EDGES))
+    for start, end in self.EDGES:
+      self.assertEqual(coloring[start, end], coloring[end, start])
+    self.assertDictEqual(coloring.to_dict(), dict(coloring.items()))
+    self.assertNotIn((0, 1), coloring)
+    with self.assertRaises(KeyError):
+      coloring[0, 5]
+
+  def test_coloring_of_multigraph(self):
+    graph = bipartite.graph.UDGraph(edges=self.EDGES + [ (0, 3), (1, 5) ])
+    for algorithm in 'Vising', 'Cole-Hopcroft':
+      coloring = bipartite.coloring.colorize(graph, algorithm=algorithm)
+      self.assertTrue(bipartite.coloring.is_valid(coloring, graph))
+      self.assertEqual(max(coloring.values()) + 1, graph.max_degree)
+
+  def test_is_valid_with_dict(self):
+    graph = bipartite.graph.UDGraph(edges=[ (0, 1), (1, 2) ])
+    self.assertTrue(bipartite.coloring.is_valid(
+        {(0, 1): 0, (1, 0): 0, (1, 2): 1, (2, 1): 1}, graph))
+    self.assertFalse(bipartite.coloring.is_valid(
+        {(0, 1): 0, (1, 0): 0, (1, 2): 0, (2, 1): 0}, graph))
+
+
+
+class AlonColoringTestCase(unittest.TestCase):
+  """ Test Alon's edge coloring. """
+
+  EDGES = [ (0, 3), (0, 4), (1, 3), (1, 4), (1, 5), (2, 3) ]
+
+  def test_alon_coloring_simple(self):
+    graph = bipartite.graph.UDGraph(edges=self.EDGES)
+    coloring = bipartite.coloring.colorize(graph, algorithm='Alon')
+    self.assertTrue(bipartite.coloring.is_valid(coloring, graph))
+    self.assertEqual(max(coloring.values()) + 1, graph.max_degree)
+
+  def test_alon_coloring_of_disconnected_multigraph(self):
+    graph = bipartite.graph.UDGraph(edges=self.EDGES + [ (0, 3), (7, 9), 
+                                                         (8, 9), (7, 10) ])
+    coloring = bipartite.coloring.colorize(graph, algorithm='Alon')
+    self.assertTrue(bipartite.coloring.is_valid(coloring, graph))
+    self.assertEqual(max(coloring.values()) + 1, graph.max_degree)
+    self.assertNotIn(bipartite.coloring.EdgeColoring.NOCOLOR, 
+                     coloring.values())
+
+  def test_alon_coloring_of_not_bipartite_graph(self):
+    graph = bipartite.graph.UDGraph(edges=[ (0, 1), (1, 2), (2, 0) ])
+    self.assertIsNone(bipartite.coloring.colorize(graph, algorithm='Alon'))
+
+
+
+class AutoColoringTestCase(unittest.TestCase):
+  """ Test choice of a coloring algorithm by estimated times. """
+
+  EDGES = [ (0, 5), (0, 6), (0, 7), (1, 5), (1, 8), (2, 6), (2, 8), (3, 7),
+            (3, 9), (4, 9), (4, 5) ]
+
+  def test_auto_coloring(self):
+    graph = bipartite.graph.UDGraph(edges=self.EDGES)
+    coloring = bipartite.coloring.colorize(graph, algorithm='auto')
+    self.assertTrue(bipartite.coloring.is_valid(coloring, graph))
+    self.assertEqual(max(coloring.values()) + 1, graph.max_degree)
+
+  def test_auto_coloring_costs_override(self):
+    graph = bipartite.graph.UDGraph(edges=self.EDGES)
+    costs = { 'Vising': 1., 'Cole-Hopcroft': 1e-3, 'Alon': 1. }
+    self.assertEqual(bipartite.coloring.choose_algorithm(graph, costs), 
+                     'Cole-Hopcroft')
+    self.assertEqual(bipartite.coloring.choose_algorithm(graph, 
+                                                         { 'Vising': 1e-9 }),
+                     'Vising')
+
+  def test_odd_degree_costs_more_than_power_of_two(self):
+    self.assertEqual(bipartite.coloring._split_units(8, 10), 3)
+    self.assertGreater(bipartite.coloring._split_units(7, 10), 
+                       bipartite.coloring._split_units(8, 10))
+
+  def test_auto_coloring_of_regular_graph(self):
+    # Vising's algorithm swaps long alternating paths on a random regular graph
+    # while Euler splits halve its power-of-two degree evenly
+    rng = random.Random(0)
+    edges = list()
+
+    for _ in range(4):
+      ends = list(range(256, 512))
+      rng.shuffle(ends)
+      edges.extend(enumerate(ends))
+    rng.shuffle(edges)
+
+    graph = bipartite.graph.UDGraph(edges=edges)
+    self.assertEqual(bipartite.coloring.choose_algorithm(graph), 
+                     'Cole-Hopcroft')
+
+    coloring = bipartite.coloring.colorize(graph, algorithm='auto')
+    self.assertTrue(bipartite.coloring.is_valid(coloring, graph))
+    self.assertEqual(max(coloring.values()) + 1, 4)
+
+  def test_conflict_rate(self):
+    graph = bipartite.graph.UDGraph(edges=self.EDGES)
+    degrees = [ graph.degree(v) for v in graph.get_vertices() ]
+    rate = bipartite.coloring._conflict_rate(graph, degrees, graph.max_degree)
+    self.assertGreater(rate, 0.)
+    self.assertLess(rate, 1.)
+
+    graph = bipartite.graph.UDGraph(edges=[ (0, 2), (0, 3), (1, 2), (1, 3) ])
+    self.assertEqual(bipartite.coloring._conflict_rate(graph, [2] * 4, 2), 1.)
+
+
+
+class ComponentColoringTestCase(unittest.TestCase):
+  """ Test splitting into components and their coloring on a process pool. """
+
+  # Two components, the second of them is Alon's worst case of an odd degree, 
+  # and an isolated vertex 4
+  EDGES = [ (0, 5), (0, 6), (1, 5), (1, 6), (2, 7), (2, 8), (2, 9), (3, 7),
+            (3, 8), (3, 9), (10, 7) ]
+
+  def test_split_components(self):
+    graph = bipartite.graph.UDGraph(edges=self.EDGES)
+    parts = bipartite.tools.split_components(graph)
+
+    self.assertEqual([ vertices.tolist() for _, vertices in parts ], 
+                     [ [0, 1, 5, 6], [2, 3, 7, 8, 9, 10], [4] ])
+
+    for component, vertices in parts:
+      self.assertTrue(component.undirected)
+      for local, incidence in enumerate(component.edges):
+        self.assertEqual([ vertices[end] for end in incidence ],
+                         list(graph.edges[vertices[local]]))
+
+  def test_colorize_components(self):
+    graph = bipartite.graph.UDGraph(edges=self.EDGES)
+
+    for algorithm in ('Vising', 'Cole-Hopcroft', 'Alon', 'auto'):
+      for workers in (1, 2):
+        coloring = bipartite.coloring.colorize(graph, algorithm, 
+                                               workers=workers)
+        self.assertTrue(bipartite.coloring.is_valid(coloring, graph))
+        self.assertEqual(max(coloring.values()) + 1, graph.max_degree)
+
+  def test_colorize_components_unknown_algorithm(self):
+    graph = bipartite.graph.UDGraph(edges=self.EDGES)
+    self.assertIsNone(bipartite.coloring.colorize(graph, 'Unknown', workers=1))
+
+  def test_pickle_csr_graph(self):
+    import pickle
+    graph = bipartite.graph.CSRGraph(
+        graph=bipartite.graph.UDGraph(edges=self.EDGES))
+    copy = pickle.loads(pickle.dumps(graph))
+
+    self.assertEqual(copy, graph)
+    self.assertTrue(copy.undirected)
+    self.assertEqual(copy.max_degree, graph.max_degree)
+
+
+
+class MaximumMatchingTestCase(unittest.TestCase):
+  """ Test Hopcroft-Karp maximum matching and its warm start. """
+
+  EDGES = [ (0, 5), (0, 6), (1, 5), (2, 5), (2, 7), (3, 7), (4, 7) ]
+
+  def assertMatching(self, mate, graph, size):
+    self.assertEqual(sum(1 for end in mate if end >= 0), 2 * size)
+
+    for vertex, end in enumerate(mate):
+      if end >= 0:
+        self.assertEqual(mate[end], vertex)
+        self.assertIn(end, list(graph.edges[vertex]))
+
+  def test_maximum_matching(self):
+    graph = bipartite.graph.UDGraph(edges=self.EDGES)
+    mate = bipartite.matching.maximum_matching(graph)
+    self.assertMatching(mate, graph, 3)
+
+  def test_maximum_matching_of_reindexed_layout(self):
+    graph = bipartite.graph.UDGraph(edges=self.EDGES)
+    mate = bipartite.matching.maximum_matching(graph, left_num=5)
+    self.assertMatching(mate, graph, 3)
+
+    csr = bipartite.graph.CSRGraph(graph, undirected=True)
+    mate = bipartite.matching.maximum_matching(csr, left_num=5)
+    self.assertMatching(mate, graph, 3)
+
+  def test_maximum_matching_warm_start(self):
+    graph = bipartite.graph.UDGraph(edges=self.EDGES)
+    mate = [-1] * graph.vertices_num
+    mate[0], mate[5] = 5, 0
+    mate[2], mate[7] = 7, 2
+
+    result = bipartite.matching.maximum_matching(graph, mate=mate)
+    self.assertMatching(result, graph, 3)
+
+  def test_maximum_matching_invalid_input(self):
+    graph = bipartite.graph.UDGraph(edges=[ (0, 1), (1, 2), (2, 0) ])
+    self.assertIsNone(bipartite.matching.maximum_matching(graph))
+
+  def test_maximum_matching_malformed_warm_start(self):
+    graph = bipartite.graph.UDGraph(edges=self.EDGES)
+
+    # asymmetric, out of range and of a wrong length
+    for pairs, length in [ ({ 0: 5 }, 8), ({ 0: 8 }, 8), ({}, 7) ]:
+      mate = [-1] * length
+
+      for vertex, end in pairs.items():
+        mate[vertex] = end
+
+      with self.assertRaises(ValueError):
+        bipartite.matching.maximum_matching(graph, mate=mate)
+
+  def test_maximum_matching_warm_start_of_not_edges(self):
+    graph = bipartite.graph.UDGraph(edges=self.EDGES)
+
+    # (0, 7) is not an edge and (0, 1) is within the left part
+    for pair in [ (0, 7), (0, 1) ]:
+      mate = [-1] * graph.vertices_num
+      mate[pair[0]], mate[pair[1]] = pair[1], pair[0]
+
+      with self.assertRaises(ValueError):
+        bipartite.matching.maximum_matching(graph, mate=mate)
+
+      with self.assertRaises(ValueError):
+        bipartite.matching.maximum_matching(graph, left_num=5, mate=mate)
+
+
+
+class TraversalTestCase(unittest.TestCase):
+  """ Test iterative traversals, their hooks, components and cycle search. """
+
+  EDGES = [ (0, 1), (0, 2), (1, 3), (2, 3), (4, 5) ]
+
+  def test_traverse_orders(self):
+    graph = bipartite.graph.UDGraph(edges=self.EDGES)
+    self.assertEqual(list(bipartite.tools.traverse(graph)), 
+                     [0, 1, 3, 2, 4, 5])
+    self.assertEqual(list(bipartite.tools.traverse(graph, 'bfs')), 
+                     [0, 1, 2, 3, 4, 5])
+    self.assertEqual(list(bipartite.tools.traverse(graph, start=5)), [5, 4])
+
+  def test_traverse_hooks(self):
+    graph = bipartite.graph.UDGraph(edges=self.EDGES)
+    finished = list()
+
+    bipartite.tools.traverse(graph, start=0, 
+        post_visit=lambda vertex, parent: finished.append((vertex, parent)))
+    self.assertEqual(finished, [ (2, 3), (3, 1), (1, 0), (0, -1) ])
+    
+    visited = list()
+    bipartite.tools.dfs2(graph, visited.append, start=3)
+    self.assertEqual(visited, [3, 1, 0, 2])
+
+  def test_components(self):
+    graph = bipartite.graph.UDGraph(edges=self.EDGES, vertices_num=7)
+    labels, count = bipartite.tools.components(graph)
+    self.assertEqual(list(labels), [0, 0, 0, 0, 1, 1, 2])
+    self.assertEqual(count, 3)
+
+  def test_has_cycle(self):
+    graph = bipartite.graph.UDGraph(edges=self.EDGES)
+    self.assertTrue(bipartite.tools.has_cycle(graph))
+
+    tree = bipartite.graph.UDGraph(edges=[ (0, 1), (0, 2), (2, 3) ])
+    self.assertFalse(bipartite.tools.has_cycle(tree))
+
+    tree.add_edge(2, 3)
+    self.assertTrue(bipartite.tools.has_cycle(tree))
+
+    dag = bipartite.graph.Graph(edges=[ (0, 1), (0, 2), (1, 2), (2, 3) ])
+    self.assertFalse(bipartite.tools.has_cycle(dag))
+
+    dag.add_edge(3, 1)
+    self.assertTrue(bipartite.tools.has_cycle(dag))
+
+  def test_has_cycle_of_directed_graph(self):
+    # A diamond has a cycle regardless of directions only
+    diamond = bipartite.graph.Graph(edges=[ (0, 1), (0, 2), (1, 3), (2, 3) ])
+    self.assertFalse(bipartite.tools.has_cycle(diamond))
+    self.assertTrue(bipartite.tools.has_cycle(
+        bipartite.graph.UDGraph(graph=diamond)))
+
+    csr = bipartite.graph.CSRGraph(graph=diamond)
+    self.assertFalse(bipartite.tools.has_cycle(csr))
+
+    loop = bipartite.graph.Graph(edges=[ (0, 1), (1, 1) ])
+    self.assertTrue(bipartite.tools.has_cycle(loop))
+
+    # A cycle reached from a vertex outside of it
+    graph = bipartite.graph.Graph(edges=[ (0, 3), (1, 2), (2, 3), (3, 1) ])
+    self.assertTrue(bipartite.tools.has_cycle(graph))
+
+  def test_long_path(self):
+    size = 100000
+    path = bipartite.graph.UDGraph(edges=[ (i, i + 1) for i in range(size) ])
+    self.assertFalse(bipartite.tools.has_cycle(path))
+
+    visited = list()
+    bipartite.tools.dfs2(path, visited.append, start=0)
+    self.assertEqual(visited, list(range(size + 1)))
+
+  def test_dense_dag(self):
+    size = 200
+    dag = bipartite.graph.Graph(edges=[ (i, j) for i in range(size) 
+                                               for j in range(i + 1, size) ])
+    self.assertFalse(bipartite.tools.has_cycle(dag))
+
+
+
+class BipartitionTestCase(unittest.TestCase):
+  """ Test bipartition of graphs and its check by spanning tree. """
+
+  def test_bipartition_of_disconnected_graph(self):
+    graph = bipartite.graph.UDGraph(edges=[ (0, 1), (1, 2), (3, 4), (4, 5), 
+                                            (5, 6), (6, 3) ])
+    parts = bipartite.tools.bipartition(graph)
+    self.assertEqual(list(parts), [0, 1, 0, 0, 1, 0, 1])
+    self.assertTrue(bipartite.tools.is_bipartite(graph))
+
+  def test_odd_cycle_witness(self):
+    graph = bipartite.graph.UDGraph(edges=[ (0, 1), (2, 3), (3, 4), (4, 5), 
+                                            (5, 6), (6, 2) ])
+    parts, cycle = bipartite.tools.bipartition(graph, odd_cycle=True)
+    self.assertIsNone(parts)
+    self.assertEqual(len(cycle) % 2, 1)
+    self.assertEqual(set(cycle), {2, 3, 4, 5, 6})
+
+    for one, two in zip(cycle, cycle[1:] + cycle[:1]):
+      self.assertIn(two, graph.edges[one])
+
+  def test_bipartition_of_long_path(self):
+    size = 100000
+    graph = bipartite.graph.UDGraph(edges=[ (i, i + 1) for i in range(size) ])
+    parts = bipartite.tools.bipartition(graph)
+    self.assertEqual(sum(parts), (size + 1) // 2)
+
+  def test_spanning_is_bipartite(self):
+    graph = bipartite.graph.UDGraph(edges=[ (0, 1), (2, 3), (3, 4), (4, 2) ])
+    self.assertFalse(bipartite.spanning.SpanningBGraph.is_bipartite(graph))
+
+    graph.remove_edge(4, 2)
+    self.assertTrue(bipartite.spanning.SpanningBGraph.is_bipartite(graph))
+    self.assertEqual(list(bipartite.spanning.SpanningBGraph.is_bipartite(
+                     graph, get_parts=True)), [0, 1, 0, 1, 0])
+
+
+
+class SpanningStatesTestCase(unittest.TestCase):
+  """ Test search of spanning bipartite subgraphs and its engines. """
+
+  def test_state_set(self):
+    states = bipartite.spanning._StateSet(3, capacity=4)
+
+    for state in range(0, 1 << 24, 4099):
+      self.assertTrue(states.add(state))
+      self.assertFalse(states.add(state))
+    
+    self.assertEqual(len(states), len(range(0, 1 << 24, 4099)))
+    self.assertIn(4099 * 7, states)
+    self.assertNotIn(4099 * 7 + 1, states)
+
+  def test_state_set_capacity_is_power_of_two(self):
+    for capacity, rounded in [ (1, 2), (4, 4), (5, 8), (1000, 1024) ]:
+      states = bipartite.spanning._StateSet(2, capacity=capacity)
+      self.assertEqual(states.capacity, rounded)
+
+    states = bipartite.spanning._StateSet(2, capacity=5)
+
+    for state in range(0, 1 << 16, 97):
+      states.add(state)
+    
+    self.assertTrue(all(state in states for state in range(0, 1 << 16, 97)))
+    self.assertNotIn(98, states)
+
+  def test_node_metrics_are_updated_incrementally(self):
+    graph = bipartite.generating.bgraph(30, .3, .3, .3, seed=2)
+    graph.add_edge(0, 0)
+    spanning = bipartite.spanning.SpanningBGraph(graph)
+    rng = random.Random(0)
+
+    code = 0
+    node = spanning._SpanningBGraph__make_node(code)
+
+    for _ in range(200):
+      vertex = rng.randrange(graph.vertices_num)
+      spanning._SpanningBGraph__invert_node(node, vertex)
+      code ^= 1 << vertex
+
+      self.assertEqual(list(node.colors), 
+                       [ (code >> v) & 1 for v in graph.get_vertices() ])
+
+      expected = spanning._SpanningBGraph__make_node(code)
+      self.assertEqual(node.degrees, expected.degrees)
+      self.assertEqual(node.histogram, expected.histogram)
+      self.assertEqual(node.degree_sum, expected.degree_sum)
+      self.assertEqual(node.degree_max, expected.degree_max)
+
+  def test_spilled_search_equals_in_memory_one(self):
+    import tempfile
+    graph = bipartite.generating.grid(4)
+    coloring = tuple(0 for _ in graph.get_vertices())
+
+    spanning = bipartite.spanning.SpanningBGraph(graph)
+    spanning(coloring, 3)
+
+    with tempfile.TemporaryDirectory() as directory:
+      spilled = bipartite.spanning.SpanningBGraph(graph, spill_dir=directory)
+      spilled(coloring, 3)
+    
+    self.assertEqual(spanning._optimum, spilled._optimum)
+    self.assertEqual(len(spanning._visited), len(spilled._visited))
+    self.assertIsInstance(spanning._visited, bipartite.spanning._StateSet)
+    self.assertIsInstance(spanning._visited.buffer, bytearray)
+    self.assertEqual(spanning._optimum[1][0], (1,) + (0,) * 15)
+
+  def test_parallel_search_equals_serial_one(self):
+    graph = bipartite.generating.grid(4)
+    coloring = tuple(0 for _ in graph.get_vertices())
+
+    spanning = bipartite.spanning.SpanningBGraph(graph)
+    spanning(coloring, 4)
+
+    parallel = bipartite.spanning.SpanningBGraph(graph)
+    parallel(coloring, 4, workers=2)
+
+    self.assertEqual(spanning._optimum, parallel._optimum)
+    self.assertEqual(len(spanning._visited), len(parallel._visited))
+
+    csr = bipartite.graph.CSRGraph(graph=graph)
+    parallel = bipartite.spanning.SpanningBGraph(csr)
+    parallel(coloring, 4, workers=2)
+    self.assertEqual(spanning._optimum, parallel._optimum)
+
+  def test_anneal_engine(self):
+    graph = bipartite.generating.grid(4)
+    coloring = tuple(0 for _ in graph.get_vertices())
+
+    spanning = bipartite.spanning.SpanningBGraph(graph)
+    bgraph = spanning(coloring, 16, engine='anneal', iterations=5000, seed=0)
+
+    exhaustive = bipartite.spanning.SpanningBGraph(graph)
+    exhaustive(coloring, 16)
+    best = min(metrics for _, metrics in exhaustive._optimum)
+
+    self.assertIsNotNone(bgraph)
+    self.assertAlmostEqual(spanning._min_metrics, best)
+    
+    trajectory = [ metrics for _, _, metrics in spanning._trajectory ]
+    self.assertEqual(trajectory, sorted(trajectory, reverse=True))
+    self.assertEqual(trajectory[-1], spanning._min_metrics)
+
+    # Annealing keeps only the endpoints of its walk, not optima by distance
+    self.assertIsNone(spanning.make_bgraph('distance', 1))
+    self.assertIsNotNone(exhaustive.make_bgraph('distance', 1))
+
+  def test_anneal_engine_max_distance(self):
+    graph = bipartite.generating.grid(4)
+    coloring = tuple(0 for _ in graph.get_vertices())
+
+    spanning = bipartite.spanning.SpanningBGraph(graph)
+    spanning(coloring, 2, engine='anneal', iterations=2000, seed=0)
+    self.assertLessEqual(sum(spanning._min_coloring), 2)
+
+    self.assertIsNone(spanning(coloring, 2, engine='unknown'))
+
+    for temperature in [ (1., 0.), (0., 1e-3), (1., -1.) ]:
+      self.assertIsNone(spanning(coloring, 2, engine='anneal', iterations=10,
+                                 temperature=temperature))
+
+  def test_bgraph_is_subgraph(self):
+    graph = bipartite.generating.grid(4)
+    spanning = bipartite.spanning.SpanningBGraph(graph)
+    bgraph = spanning(tuple(0 for _ in graph.get_vertices()), 3)
+    coloring = spanning._min_coloring
+
+    self.assertEqual(bgraph.vertices_num, graph.vertices_num)
+
+    for vertex in graph.get_vertices():
+      self.assertEqual(sorted(bgraph.edges[vertex]), 
+                       sorted(end for end in graph.edges[vertex] 
+                                  if coloring[end] != coloring[vertex]))
+    
+    view = spanning.make_bgraph(lazy=True)
+    self.assertIsInstance(view, bipartite.graph.CutGraph)
+    self.assertEqual(view.to_graph(), bgraph)
+    self.assertEqual(view.max_degree, bgraph.max_degree)
+
+    coloring = bipartite.coloring.colorize(view)
+    self.assertTrue(bipartite.coloring.is_valid(coloring, bgraph))
+
+  def test_reindex_splits_parts(self):
+    graph = bipartite.generating.grid(4)
+    spanning = bipartite.spanning.SpanningBGraph(graph)
+    spanning(tuple(0 for _ in graph.get_vertices()), 3)
+    ones = sum(spanning._min_coloring)
+
+    bgraph = spanning.reindex()
+    self.assertEqual(sum(map(len, bgraph.edges)), 
+                     sum(map(len, spanning._bgraph.edges)))
+    
+    for vertex in bgraph.get_vertices():
+      for end in bgraph.edges[vertex]:
+        self.assertNotEqual(vertex < ones, end < ones)
+
+
+
+class GeoTestCase(unittest.TestCase):
+  """ Test geometric random graph generation and its scene of places. """
+
+  def test_make_edges_equals_pairwise_search(self):
+    rng = random.Random(0)
+    gen = bipartite.generating.Geo(10, 25, (300, 300), (90, 90))
+    cells = [ (x, y) for x in range(90) for y in range(90) ]
+    gen._places = rng.sample(cells, 300)
+    gen.make_edges()
+
+    expected = [ (one, two) for one in range(300) for two in range(one + 1, 300)
+                 if gen.distance(gen._places[one], gen._places[two]) < 
+                    gen.r_allowed ]
+    
+    self.assertTrue(expected)
+    self.assertEqual(gen._edges, expected)
+
+  def test_generation_is_reproducible(self):
+    one = bipartite.generating.Geo(10, 25, (600, 600), (120, 120), seed=7)
+    two = bipartite.generating.Geo(10, 25, (600, 600), (120, 120), 
+                                   seed=random.Random(7))
+    
+    self.assertEqual(one(100).edges, two(100).edges)
+    self.assertEqual(one._places, two._places)
+    self.assertTrue(one.is_valid())
+
+  def test_available_places(self):
+    gen = bipartite.generating.Geo(10, 25, (600, 600), (120, 120), seed=0)
+    gen(50)
+
+    available = { (x, y) for x in range(120) for y in range(120) 
+                         if gen.scene[x][y] == 1 }
+    
+    self.assertEqual(set(gen._available), available)
+    self.assertEqual(len(gen._available), len(available))
+
+    for place, position in gen._positions.items():
+      self.assertEqual(gen._available[position], place)
+
+  @unittest.skipIf(bipartite.generating.numpy is None, 'NumPy is not installed')
+  def test_numpy_scene_equals_list_one(self):
+    one = bipartite.generating.Geo(10, 60, (600, 600), (150, 150), seed=3)
+    two = bipartite.generating.Geo(10, 60, (600, 600), (150, 150), seed=3, 
+                                   use_numpy=True)
+    
+    self.assertEqual(one(60).edges, two(60).edges)
+    self.assertEqual(one._available, two._available)
+    self.assertEqual(one.scene, two.scene.tolist())
+
+  @unittest.skipIf(bipartite.generating.numpy is not None, 'NumPy is installed')
+  def test_numpy_scene_requires_numpy(self):
+    with self.assertRaises(ImportError):
+      bipartite.generating.Geo(10, 60, (600, 600), (150, 150), use_numpy=True)
+
+
+
+class BGraphTestCase(unittest.TestCase):
+  """ Test random bipartite graph generation. """
+
+  def test_bgraph_is_bipartite(self):
+    graph = bipartite.generating.bgraph(200, .3, .3, .2, seed=1)
+    part_one = 60
+
+    self.assertEqual(graph.vertices_num, 200)
+
+    for start in graph.get_vertices():
+      for end in graph.edges[start]:
+        self.assertNotEqual(start < part_one, end < part_one)
+        self.assertIn(start, graph.edges[end])
+    
+    edges_num = sum(map(len, graph.edges)) // 2
+    self.assertLess(abs(edges_num - .2 * 60 * 140), 200)
+
+  def test_bgraph_edge_probability_bounds(self):
+    complete = bipartite.generating.bgraph(10, .5, .5, 1., seed=0)
+    self.assertEqual(complete.edges[0], [5, 6, 7, 8, 9])
+    self.assertEqual(complete.max_degree, 5)
+
+    empty = bipartite.generating.bgraph(10, .5, .5, 0., seed=0)
+    self.assertEqual(empty.max_degree, 0)
+
+  def test_bgraph_is_reproducible(self):
+    self.assertEqual(bipartite.generating.bgraph(50, seed=3).edges,
+                     bipartite.generating.bgraph(50, seed=3).edges)
+
+  def test_bgraph_of_tiny_and_zero_edge_prob(self):
+    for edge_prob in (1e-20, 1e-300, 0.):
+      graph = bipartite.generating.bgraph(10, edge_prob=edge_prob, seed=0)
+      self.assertEqual(graph.vertices_num, 10)
+      self.assertEqual(graph.max_degree, 0)
+
+    graph = bipartite.generating.bgraph(10, .5, .5, 1., seed=0)
+    self.assertEqual(sum(map(len, graph.edges)), 2 * 25)
+
+
+
+class StreamsTestCase(unittest.TestCase):
+  """ Test streaming readers and writers of edge lists and colorings. """
+
+  EDGES = [ (0, 3), (0, 4), (1, 3), (1, 4), (1, 5), (2, 3) ]
+
+  def setUp(self):
+    import tempfile
+    self.directory = tempfile.TemporaryDirectory()
+
+  def tearDown(self):
+    self.directory.cleanup()
+
+  def path(self, name):
+    import os
+    return os.path.join(self.directory.name, name)
+
+  def test_edges_round_trip(self):
+    graph = bipartite.graph.UDGraph(edges=self.EDGES)
+
+    for name, binary in (('e.txt', False), ('e.txt.gz', False), 
+                         ('e.bin', True)):
+      rows = bipartite.streams.write_edges(graph, self.path(name), binary)
+      self.assertEqual(rows, len(self.EDGES))
+
+      loaded = bipartite.streams.read_graph(self.path(name), binary=binary, 
+                                            chunk_size=8)
+      self.assertEqual(loaded.edges, graph.edges)
+
+  def test_read_text_chunks(self):
+    with open(self.path('e.csv'), 'w') as file:
+      file.write('# start,end\n0,3 # first\n\n% comment\n10,  2\r\n7 1')
+
+    chunks = list(bipartite.streams.read_chunks(self.path('e.csv'), 
+                                                chunk_size=4))
+    self.assertEqual(sum((starts.tolist() for starts, _ in chunks), []), 
+                     [0, 10, 7])
+    self.assertEqual(sum((ends.tolist() for _, ends in chunks), []), 
+                     [3, 2, 1])
+
+    with open(self.path('e.txt'), 'w') as file:
+      file.write('0 1\n2\n')
+    self.assertRaises(ValueError, list, 
+                      bipartite.streams.read_chunks(self.path('e.txt')))
+
+  def test_write_coloring(self):
+    graph = bipartite.graph.UDGraph(edges=self.EDGES)
+    coloring = bipartite.coloring.colorize(graph)
+
+    for binary in (False, True):
+      path = self.path('c.bin' if binary else 'c.txt')
+      rows = bipartite.streams.write_coloring(coloring, path, binary)
+      self.assertEqual(rows, len(self.EDGES))
+
+      loaded = { (start, end): color 
+                   for chunk in bipartite.streams.read_chunks(path, 3, binary)
+                   for start, end, color in zip(*chunk) }
+      self.assertEqual(loaded, { edge: coloring[edge] for edge in self.EDGES })
+
+  def test_write_coloring_of_dict(self):
+    graph = bipartite.graph.UDGraph(edges=self.EDGES)
+    coloring = dict(bipartite.coloring.colorize(graph).items())
+    self.assertEqual(len(coloring), 2 * len(self.EDGES))
+
+    # one half of the edge (0, 3) only
+    del coloring[0, 3]
+
+    rows = bipartite.streams.write_coloring(coloring, self.path('c.txt'))
+    self.assertEqual(rows, len(self.EDGES))
+
+    loaded = { (start, end): color 
+                 for chunk in bipartite.streams.read_chunks(self.path('c.txt'),
+                                                            3)
+                 for start, end, color in zip(*chunk) }
+    self.assertEqual(loaded, { edge: coloring[edge[::-1]] 
+                               for edge in self.EDGES })
+
+  def test_write_trajectory(self):
+    graph = bipartite.generating.grid(2)
+    spanning = bipartite.spanning.SpanningBGraph(graph)
+    spanning((0, 0, 0, 0), 2)
+
+    rows = bipartite.streams.write_trajectory(spanning, self.path('t.txt'))
+    self.assertEqual(rows, len(spanning._optimum))
+
+    with open(self.path('t.txt')) as file:
+      lines = file.read().split('\n')
+    self.assertEqual(lines[1], f'0 {spanning._optimum[0][1]!r} 0000')
+
+    spanning((0, 0, 0, 0), 2, engine='anneal', iterations=100, seed=0)
+    self.assertRaises(ValueError, bipartite.streams.write_trajectory, 
+                      spanning, self.path('t.txt'))
+
+
+
+class BenchmarkSuiteTestCase(unittest.TestCase):
+  """ Test comparing benchmark results with a baseline. """
+
+  BASELINE = { 'results': [
+    { 'name': 'a', 'size': 10, 'time': .1, 'peak_memory': 1000 },
+    { 'name': 'a', 'size': 20, 'time': .2, 'peak_memory': 2000 },
+    { 'name': 'b', 'size': 10, 'time': .0001, 'peak_memory': 0 },
+  ] }
+
+  def setUp(self):
+    import tempfile
+    self.directory = tempfile.TemporaryDirectory()
+
+  def tearDown(self):
+    self.directory.cleanup()
+
+  def path(self, name):
+    import os
+    return os.path.join(self.directory.name, name)
+
+  def test_compare(self):
+    import benchmarks.suite
+    report = { 'results': [
+      # slower by more than the threshold
+      { 'name': 'a', 'size': 10, 'time': .13, 'peak_memory': 1000 },
+      # more memory by more than the threshold, faster
+      { 'name': 'a', 'size': 20, 'time': .1, 'peak_memory': 2600 },
+      # slower within the resolution of time, no baseline memory
+      { 'name': 'b', 'size': 10, 'time': .0009, 'peak_memory': 500 },
+      # missing in the baseline
+      { 'name': 'b', 'size': 20, 'time': 10., 'peak_memory': 10 ** 6 },
+      { 'name': 'c', 'size': 10, 'time': 10., 'peak_memory': 10 ** 6 },
+    ] }
+
+    regressions = benchmarks.suite.compare(report, self.BASELINE)
+    self.assertEqual([ (r['name'], r['size'], r['metric']) 
+                       for r in regressions ],
+                     [ ('a', 10, 'time'), ('a', 20, 'peak_memory') ])
+    self.assertEqual(regressions[0]['baseline'], .1)
+    self.assertEqual(regressions[0]['current'], .13)
+    self.assertAlmostEqual(regressions[0]['ratio'], 1.3)
+    self.assertAlmostEqual(regressions[1]['ratio'], 1.3)
+
+    self.assertEqual(benchmarks.suite.compare(report, self.BASELINE, .5), [])
+    self.assertEqual(benchmarks.suite.compare(report, { 'results': [] }), [])
+    self.assertEqual(benchmarks.suite.compare(self.BASELINE, self.BASELINE), 
+                     [])
+
+  def test_exit_status(self):
+    import contextlib, io, json
+    import benchmarks.suite
+    args = [ 'generating.grid', '--quick', '--repeat', '1' ]
+
+    with contextlib.redirect_stdout(io.StringIO()):
+      self.assertEqual(benchmarks.suite.main(
+          args + [ '--output', self.path('base.json') ]), 0)
+
+    with open(self.path('base.json')) as file:
+      baseline = json.load(file)
+    self.assertEqual([ result['name'] for result in baseline['results'] ],
+                     [ 'generating.grid' ] * 2)
+
+    # A run compared with itself within a loose threshold
+    with contextlib.redirect_stdout(io.StringIO()):
+      self.assertEqual(benchmarks.suite.main(
+          args + [ '--baseline', self.path('base.json'), 
+                   '--threshold', '100' ]), 0)
+
+    # A baseline of much less memory
+    for result in baseline['results']:
+      result['peak_memory'] = 1
+    with open(self.path('low.json'), 'w') as file:
+      json.dump(baseline, file)
+
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+      self.assertEqual(benchmarks.suite.main(
+          args + [ '--baseline', self.path('low.json') ]), 1)
+    self.assertEqual(output.getvalue().count('REGRESSION generating.grid'), 2)
+
+    # Cases missing in the baseline are not regressions
+    with open(self.path('other.json'), 'w') as file:
+      json.dump({ 'results': [ dict(result, name='other') 
+                               for result in baseline['results'] ] }, file)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+      self.assertEqual(benchmarks.suite.main(
+          args + [ '--baseline', self.path('other.json') ]), 0)
+
+
+
+if __name__ == '__main__':
+
+  unittest.main()